@@ -7,7 +7,12 @@ mkdir deploy
 # Copy your source code
 cp -r src/ deploy/
 cp lambda_function.py deploy/
-cp rolfsen_pd_dict.json deploy/
+
+# Pack the Rolfsen table into a binary file
+python -m src.rolfsen rolfsen_pd_dict.json deploy/rolfsen_pd.bin
+
+# Warm the invariant cache for the Rolfsen table
+python -c "import lambda_function; lambda_function.warm_cache('deploy/invariant_cache.sqlite')"
 
 # Install dependencies into deploy folder
 pip install --target deploy/ pillow --platform manylinux2014_x86_64 --only-binary=:all: --upgrade
@@ -1,39 +1,11 @@
-import os 
-import pickle
-import signal
-import sys
+import argparse
+import os
 from random import randint
 from itertools import product
 from src.two_bridge_knots import TwoBridgeDiagram
+from src.specialization import SpecializationSearch, run_sharded
 
 
-def handle_interrupt(sig,frame):
-    print("\n Interrupted! Saving memo...")
-    save_memo(knot_name,memo)
-    sys.exit(0)
-
-signal.signal(signal.SIGINT, handle_interrupt)
-
-def get_memo_filename(knot_name):
-    return f"memo_{knot_name}.pkl"
-
-def load_memo(knot_name):
-    filename = get_memo_filename(knot_name)
-    if os.path.exists(filename):
-        with open(filename, "rb") as f:
-            print(f"Loading memo from {filename}")
-            return pickle.load(f)
-    else:
-        print("No existing memo for this knot yet.")
-        return {}
-
-def save_memo(knot_name,memo):
-    filename= get_memo_filename(knot_name)
-    with open(filename, "wb") as f:
-        pickle.dump(memo,f)
-    print(f"Memo saved to {filename}")
-
-    
 def get_key(fixed_segment,specialization):
     key = f"i{fixed_segment}_"
     for variable in specialization:
@@ -41,28 +13,6 @@ def get_key(fixed_segment,specialization):
         key += str(variable[1])
     return key
     
-def evaluate(jones,lattice,specialization,positives):
-    fixed_segment = lattice.fixed_segment
-    key = get_key(fixed_segment,specialization)
-    if key in memo:
-        result = memo[key]
-    else:
-        result = test_jones_specialization(jones,lattice, specialization)
-        memo[key] = result
-    if result==True:
-        positives.append(key)
-        print(f"Found candidate: {fixed_segment}, {specialization}.")
-
-def test_jones_specialization(jones,lattice,specialization):
-    f_pol = lattice.get_f_polynomial()
-    specialization = f_pol.get_specialization(specialization)
-    specialized_pol = f_pol.specialize_to_laurent(specialization)
-    if specialized_pol.equal_up_to_factor(jones):
-        specialized_pol.print_normalized_to_latex()
-        return True
-    else:
-        return False
-
 def get_random_input():
     coefficient = randint(-2,2)
     if coefficient==0:
@@ -92,15 +42,21 @@ def embed_input(lattice,input):
             monom[1]=0
     return specialization
 
-def bruteforce_spec(jones,lattice,results):
-    spec_iter = get_specialization_iter(lattice)
-    i=0
-    for spec in spec_iter:
-        i+=1
-        if i%100000==0:
-            print(f"{i} iterations")
-        specialization = embed_input(lattice, spec)
-        evaluate(jones,lattice,specialization,results)
+def bruteforce_spec(jones,lattice,results,workers=None,checkpoint_dir=None):
+    """
+    Check all specializations, with workers in a process pool with resumable checkpoints in checkpoint_dir.
+    """
+    search = SpecializationSearch(lattice, jones)
+    print(f"number of combinations to check: {search.number_of_candidates}")
+    if workers is None:
+        matches = search.run()
+    else:
+        matches = run_sharded(search, max_workers=workers, checkpoint_dir=checkpoint_dir)
+    for index, specialization in matches:
+        results.append(get_key(lattice.fixed_segment,specialization))
+        print(f"Found candidate: {lattice.fixed_segment}, {specialization}.")
+        f_pol = lattice.get_f_polynomial()
+        f_pol.specialize_to_laurent(f_pol.get_specialization(specialization)).print_normalized_to_latex()
         
 tests = [
     {"knot_name": "k1_1_2", "fixed_segment":2, "normalform": [1,1,2]},
@@ -124,21 +80,29 @@ tests = [
     {"knot_name": "k2_1_1_1", "fixed_segment": 3, "normalform": [2,1,1,2]},
          ]
 
-for test in tests:
-    knot_name = test["knot_name"]
-    fixed_segment = test["fixed_segment"]
-    knot = TwoBridgeDiagram(test["normalform"])
-    jones = knot.get_jones_polynom()
-    jones.print_normalized_to_latex()
-    lattice = knot.get_lattice(fixed_segment)
-    print(f"number of combinations to check: {5**(2*len(lattice.transposed_segments))}")
-    memo = load_memo(knot_name)
-    results = []
-    bruteforce_spec(jones,lattice,results)
-    with open("results.txt","a") as f:
-        f.write(f"\n Results Knot {knot_name} and segment {fixed_segment}: \n")
-        f.write(f"Found combinations: \n")
-        for result in results:
-            f.write(str(result)+"\n")
-    print(results)
-    save_memo(knot_name,memo)    
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(description="Search specializations of the f-polynomial giving the Jones polynom.")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, default: single process")
+    parser.add_argument("--checkpoint-dir", default=None, help="directory for the checkpoints of the parallel sweep")
+    args = parser.parse_args()
+    for test in tests:
+        knot_name = test["knot_name"]
+        fixed_segment = test["fixed_segment"]
+        knot = TwoBridgeDiagram(test["normalform"])
+        jones = knot.get_jones_polynom()
+        jones.print_normalized_to_latex()
+        lattice = knot.get_lattice(fixed_segment)
+        results = []
+        checkpoint_dir = None
+        if args.checkpoint_dir is not None:
+            checkpoint_dir = os.path.join(args.checkpoint_dir, f"{knot_name}_{fixed_segment}")
+        bruteforce_spec(jones,lattice,results,args.workers,checkpoint_dir)
+        with open("results.txt","a") as f:
+            f.write(f"\n Results Knot {knot_name} and segment {fixed_segment}: \n")
+            f.write(f"Found combinations: \n")
+            for result in results:
+                f.write(str(result)+"\n")
+        print(results)
+
+if __name__=="__main__":
+    main()
@@ -2,37 +2,89 @@ import json
 import boto3
 from botocore.exceptions import ClientError
 import os
+import shutil
 import sys
 from PIL import Image
 import PIL.Image
 
 from src.visualize import LatticeImage
 from src.knotdiagram import KnotDiagram
+from src.lattice import StateLattice
 from src.two_bridge_knots import TwoBridgeDiagram
+from src.cache import InvariantCache
+from src.rolfsen import get_rolfsen_table
+
+# the cache shipped in the deploy package is read only, it is copied to /tmp on a cold start
+PACKAGED_CACHE_PATH = "invariant_cache.sqlite"
+CACHE_PATH = "/tmp/invariant_cache.sqlite"
+invariant_cache = None
+
+RESULT_FIELDS = ("pd_notation", "number_of_states", "rank_sizes", "f_polynomial", "alexander_polynomial", "jones_polynomial",
+                 "kauffman_bracket", "minimal_state", "maximal_state", "sequence_min_to_max", "knot_diagram_quiver")
+
+def get_cache():
+    global invariant_cache
+    if invariant_cache is None:
+        if not os.path.exists(CACHE_PATH) and os.path.exists(PACKAGED_CACHE_PATH):
+            shutil.copy(PACKAGED_CACHE_PATH, CACHE_PATH)
+        invariant_cache = InvariantCache(CACHE_PATH)
+    return invariant_cache
             
-def compute_lattice_data(parsed_pd_notation,fixed_segment,filename=None):
+def compute_lattice_data(parsed_pd_notation,fixed_segment,filename=None,cache=None):
     """
     Compute the state lattice for a given knot diagram and fixed segment, and generate an image of the lattice.
+    With an InvariantCache the cached results are reused and the computed results are stored.
+    The image is not cached: if it is requested the lattice is built and drawn even if all results are cached.
+    The nodes and edges of the lattice are only stored if the image is drawn, 
+    otherwise the states are counted without building the lattice and the Alexander polynomial
+    is taken from the clock matrix. The f-polynomial has a term for every state, so without the image
+    the states are streamed layer by layer to compute it.
     """
+    results = cache.get(parsed_pd_notation, fixed_segment) if cache is not None else {}
+    cached = all(field in results for field in RESULT_FIELDS)
+    if filename is None and cached:
+        return results
     diagram = KnotDiagram(parsed_pd_notation)
-    lattice = diagram.get_lattice(fixed_segment)
+    build = filename is not None
+    lattice = StateLattice(diagram, fixed_segment, build=build)
     if filename:
         lattice_image = LatticeImage(lattice, image_size=(512, 1024), padding=(10, 20), text_size=9)
         lattice_image.draw_lattice(filename)
-    results = {
+    if cached:
+        return results
+    if "jones_polynomial" not in results:
+        results["jones_polynomial"] = diagram.get_jones_polynom().to_latex()
+    if "kauffman_bracket" not in results:
+        results["kauffman_bracket"] = diagram.get_kauffman_bracket().to_latex()
+    results.update({
         "pd_notation": str(diagram.get_pd_notation()),
-        "number_of_states": len(lattice.nodes),
+        "number_of_states": lattice.get_number_of_states(),
+        "rank_sizes": lattice.get_rank_sizes(),
         "f_polynomial": lattice.get_f_polynomial().to_latex(),
-        "alexander_polynomial": diagram.get_alexander_polynom().to_latex(),
-        "jones_polynomial": diagram.get_jones_polynom().to_latex(),
-        "kauffman_bracket": diagram.get_kauffman_bracket().to_latex(),
+        "alexander_polynomial": diagram.get_alexander_polynom("lattice" if build else "determinant").to_latex(),
         "minimal_state": str(lattice.get_minimal_state()),
         "maximal_state": str(lattice.get_maximal_state()),
         "sequence_min_to_max": str(lattice.get_sequence_min_to_max()),
         "knot_diagram_quiver": diagram.get_quiver_notation_qpa(),
-    }
+    })
+    results = {field: results[field] for field in RESULT_FIELDS}
+    if cache is not None:
+        cache.put(parsed_pd_notation, fixed_segment, results)
     return results
 
+def warm_cache(cache_path, fixed_segment=1):
+    """
+    Fill the cache with the results of all knots of the Rolfsen table for the fixed segment.
+    The handler draws the image for every Rolfsen knot (at most 11 crossings), so for these requests
+    the warmed entries only save computing the results, the lattice is still built and drawn.
+    """
+    warm = InvariantCache(cache_path)
+    for rolfsen_number, pd_notation in get_rolfsen_table().items():
+        if not pd_notation:
+            continue
+        compute_lattice_data(pd_notation, fixed_segment, cache=warm)
+    warm.close()
+
 def upload_file(file_name, bucket, object_name=None):
     """Upload a file to an S3 bucket
 
@@ -72,11 +124,7 @@ def parse_tb_input(body):
 
 def parse_rolfsen_input(body):
     rolfsen_number = body.get('knot_input')
-    rolfsen_pd_dict = None
-    with open("rolfsen_pd_dict.json") as f:
-        rolfsen_pd_dict = json.load(f)
-    pd_notation = rolfsen_pd_dict[rolfsen_number]
-    pd_notation = [tuple(crossing) for crossing in pd_notation] if pd_notation else None
+    pd_notation = get_rolfsen_table()[rolfsen_number] or None
     fixed_segment= body.get('fixed_segment',None)
     return pd_notation,fixed_segment
 
@@ -133,9 +181,9 @@ def lambda_handler(event, context):
 
     # calculate the lattice and generate the image 
     if number_of_crossings > 11:
-        result = compute_lattice_data(pd_notation, fixed_segment)
+        result = compute_lattice_data(pd_notation, fixed_segment, cache=get_cache())
     else:
-        result = compute_lattice_data(pd_notation, fixed_segment,'/tmp/'+ filename)
+        result = compute_lattice_data(pd_notation, fixed_segment,'/tmp/'+ filename, cache=get_cache())
 
         #upload lattice image to S3
         upload_file('/tmp/'+ filename , bucket ,filename)
@@ -4,6 +4,7 @@ from src.visualize import LatticeImage
 from src.algebra import JacobianAlgebra,Path, StateModule
 from src.two_bridge_knots import TwoBridgeDiagram
 from src.polynom import LaurentPolynom
+from src.rolfsen import get_rolfsen_table
 
 import json
 from PIL import Image
@@ -107,16 +108,12 @@ def get_paths_of_2bridge():
     print(paths)
 
 def get_rolfsen_pd(rolfsen_number):
-    with open("rolfsen_pd_dict.json") as f:
-        rolfsen_pd_dict = json.load(f)
-    return [tuple(x) for x in rolfsen_pd_dict[rolfsen_number]]
+    return get_rolfsen_table()[rolfsen_number]
 
 def compute_dimensions_rolfsen():
-    with open("rolfsen_pd_dict.json") as f:
-        rolfsen_pd_dict = json.load(f)
-    del rolfsen_pd_dict["0_1"]
-    for knot in rolfsen_pd_dict:
-        pd_notation = rolfsen_pd_dict[knot]
+    for knot, pd_notation in get_rolfsen_table().items():
+        if knot == "0_1":
+            continue
         algebra = JacobianAlgebra._from_pd_notation(pd_notation)
         print(f"Knot {knot} - Dimension: {algebra.get_dimension()}")
 
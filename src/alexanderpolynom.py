@@ -0,0 +1,204 @@
+from src.polynom import LaurentPolynom
+
+# weight t^power * sign of a marker at each corner (marker position 0-3) of a crossing,
+# for positive and negative crossings. The quotient of the weights of two states which differ
+# by a transposition at a segment is the Alexander specialization of the segment, 
+# up to the sign of the transposition of the two regions.
+CORNER_WEIGHTS = {
+    1: [(1,0), (1,0), (-1,1), (1,1)],
+    -1: [(1,0), (-1,0), (1,1), (1,1)],
+}
+
+def poly_trim(polynom):
+    """
+    Remove the vanishing leading coefficients of a polynom given as list of coefficients [a_0, a_1, ...]
+    """
+    while polynom and polynom[-1] == 0:
+        polynom.pop()
+    return polynom
+
+def poly_sub(polynom_a, polynom_b):
+    result = [0]*max(len(polynom_a), len(polynom_b))
+    for i, coefficient in enumerate(polynom_a):
+        result[i] += coefficient
+    for i, coefficient in enumerate(polynom_b):
+        result[i] -= coefficient
+    return poly_trim(result)
+
+def poly_mul(polynom_a, polynom_b):
+    if not polynom_a or not polynom_b:
+        return []
+    result = [0]*(len(polynom_a)+len(polynom_b)-1)
+    for i, coefficient_a in enumerate(polynom_a):
+        if coefficient_a == 0:
+            continue
+        for j, coefficient_b in enumerate(polynom_b):
+            result[i+j] += coefficient_a*coefficient_b
+    return poly_trim(result)
+
+def poly_exact_div(polynom_a, polynom_b):
+    """
+    Quotient of two integer polynoms, the division has to be exact.
+    """
+    remainder = list(polynom_a)
+    if not remainder:
+        return []
+    quotient = [0]*(len(remainder)-len(polynom_b)+1)
+    for i in range(len(quotient)-1, -1, -1):
+        coefficient, rest = divmod(remainder[i+len(polynom_b)-1], polynom_b[-1])
+        if rest != 0:
+            raise ValueError("Polynom division is not exact")
+        quotient[i] = coefficient
+        if coefficient != 0:
+            for j, coefficient_b in enumerate(polynom_b):
+                remainder[i+j] -= coefficient*coefficient_b
+    if any(remainder):
+        raise ValueError("Polynom division is not exact")
+    return poly_trim(quotient)
+
+def bareiss_determinant(matrix):
+    """
+    Determinant of a square matrix of integer polynoms (lists of coefficients) 
+    by fraction-free Gaussian elimination (Bareiss algorithm).
+    """
+    matrix = [[list(entry) for entry in row] for row in matrix]
+    size = len(matrix)
+    sign = 1
+    previous_pivot = [1]
+    for k in range(size-1):
+        if not matrix[k][k]:
+            for i in range(k+1, size):
+                if matrix[i][k]:
+                    matrix[k], matrix[i] = matrix[i], matrix[k]
+                    sign = -sign
+                    break
+            else:
+                return []
+        for i in range(k+1, size):
+            for j in range(k+1, size):
+                numerator = poly_sub(poly_mul(matrix[k][k], matrix[i][j]), poly_mul(matrix[i][k], matrix[k][j]))
+                matrix[i][j] = poly_exact_div(numerator, previous_pivot)
+        previous_pivot = matrix[k][k]
+    if size == 0:
+        return [1]
+    determinant = matrix[size-1][size-1]
+    return [sign*coefficient for coefficient in determinant]
+
+def get_permutation_sign(permutation):
+    sign = 1
+    visited = [False]*len(permutation)
+    for start in range(len(permutation)):
+        length = 0
+        i = start
+        while not visited[i]:
+            visited[i] = True
+            i = permutation[i]
+            length += 1
+        if length > 0 and length % 2 == 0:
+            sign = -sign
+    return sign
+
+def get_crossing_signs(diagram):
+    """
+    Signs of the crossings, with the orientation of the over strands found by following the strands 
+    from the incoming under segments (position 0) instead of comparing segment labels.
+    Crossings whose over strand cannot be reached this way keep the sign of Crossing.get_sign.
+    """
+    # crossing id -> position of the incoming over segment (1 or 3)
+    incoming_over = {}
+    for crossing in diagram.crossings:
+        crossing_id, position = crossing.id, 2
+        while True:
+            neighbour = diagram.crossing_neighbours[crossing_id][position]
+            if neighbour is None:
+                break
+            crossing_id, position = neighbour
+            if position % 2 == 0:
+                break
+            if crossing_id in incoming_over:
+                break
+            incoming_over[crossing_id] = position
+            position = (position + 2) % 4
+    signs = []
+    for crossing in diagram.crossings:
+        if crossing.id not in incoming_over:
+            signs.append(crossing.get_sign())
+        elif incoming_over[crossing.id] == 3:
+            signs.append(1)
+        else:
+            signs.append(-1)
+    return signs
+
+def has_consistent_orientation(diagram):
+    """
+    True if following the strand from the incoming under segment of the first crossing
+    runs through the whole diagram as one component and enters every crossing once under (position 0)
+    and once over (position 1 or 3). Only then the signs of get_crossing_signs are those of the
+    orientation the lattice path uses.
+    """
+    if not diagram.crossings:
+        return False
+    entered_under = [0]*diagram.number_of_crossings
+    entered_over = [0]*diagram.number_of_crossings
+    crossing_id, position = 0, 0
+    for step in range(diagram.number_of_segments):
+        if position == 0:
+            entered_under[crossing_id] += 1
+        elif position % 2 == 1:
+            entered_over[crossing_id] += 1
+        else:
+            return False
+        neighbour = diagram.crossing_neighbours[crossing_id][(position + 2) % 4]
+        if neighbour is None:
+            return False
+        crossing_id, position = neighbour
+    return (crossing_id, position) == (0, 0) and all(entered_under) and entered_under == entered_over
+
+def get_clock_matrix(diagram, segment):
+    """
+    Crossing x region matrix of the diagram without the two regions adjacent to the segment.
+    The entry of a crossing and a region is the sum of the weights of the corners of the crossing in the region,
+    as integer polynom.
+
+    Returns the matrix and the list of region ids of the columns.
+    """
+    excluded_regions = diagram.get_segment_regions(segment)
+    columns = [region for region in range(len(diagram.get_regions())) if region not in excluded_regions]
+    column_index = {region: i for i, region in enumerate(columns)}
+    matrix = [[[] for region in columns] for crossing in diagram.crossings]
+    signs = get_crossing_signs(diagram)
+    for crossing in diagram.crossings:
+        weights = CORNER_WEIGHTS[signs[crossing.id]]
+        for region_id, (sign, power) in enumerate(weights):
+            region = diagram.get_region_id(crossing.id, region_id)
+            if region not in column_index:
+                continue
+            entry = matrix[crossing.id][column_index[region]]
+            entry.extend([0]*(power+1-len(entry)))
+            entry[power] += sign
+    for row in matrix:
+        for entry in row:
+            poly_trim(entry)
+    return matrix, columns
+
+def get_alexander_polynom_by_determinant(diagram, minimal_state, segment):
+    """
+    The state sum of the Alexander specialization of the f-polynomial is the determinant of the clock matrix,
+    divided by the signed weight of the minimal state, so the result agrees with the lattice computation.
+    """
+    matrix, columns = get_clock_matrix(diagram, segment)
+    determinant = bareiss_determinant(matrix)
+
+    column_index = {region: i for i, region in enumerate(columns)}
+    signs = get_crossing_signs(diagram)
+    permutation = []
+    sign = 1
+    power = 0
+    for crossing in diagram.crossings:
+        marker = minimal_state.markers[crossing.id]
+        permutation.append(column_index[diagram.get_region_id(crossing.id, marker)])
+        weight_sign, weight_power = CORNER_WEIGHTS[signs[crossing.id]][marker]
+        sign *= weight_sign
+        power += weight_power
+    sign *= get_permutation_sign(permutation)
+    return LaurentPolynom([[sign*coefficient, i-power] for i, coefficient in enumerate(determinant)])
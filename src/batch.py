@@ -0,0 +1,223 @@
+import argparse
+import json
+import multiprocessing
+import multiprocessing.connection
+import sys
+import time
+import traceback
+
+from src.algebra import JacobianAlgebra
+from src.knotdiagram import KnotDiagram
+from src.lattice import StateLattice
+from src.rolfsen import get_rolfsen_table
+from src.statecount import get_rank_sizes
+from src.two_bridge_knots import TwoBridgeDiagram
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, the memory limit is then ignored
+    resource = None
+
+def compute_number_of_states(diagram, fixed_segment):
+    rank_sizes = get_rank_sizes(diagram, fixed_segment)
+    return {"number_of_states": sum(rank_sizes), "rank_sizes": rank_sizes}
+
+def compute_f_polynomial(diagram, fixed_segment):
+    return StateLattice(diagram, fixed_segment, build=False).get_f_polynomial().to_latex()
+
+def compute_alexander_polynomial(diagram, fixed_segment):
+    return diagram.get_alexander_polynom().to_latex()
+
+def compute_jones_polynomial(diagram, fixed_segment):
+    return diagram.get_jones_polynom().to_latex()
+
+def compute_kauffman_bracket(diagram, fixed_segment):
+    return diagram.get_kauffman_bracket().to_latex()
+
+def compute_dimension(diagram, fixed_segment):
+    return JacobianAlgebra._from_pd_notation(diagram.pd_notation).get_dimension()
+
+# name -> function of the diagram and the fixed segment returning a json serializable result
+INVARIANTS = {
+    "states": compute_number_of_states,
+    "f_polynomial": compute_f_polynomial,
+    "alexander": compute_alexander_polynomial,
+    "jones": compute_jones_polynomial,
+    "kauffman_bracket": compute_kauffman_bracket,
+    "dimension": compute_dimension,
+}
+
+def get_rolfsen_tasks(first=None, last=None, fixed_segment=1):
+    """
+    Tasks (name, pd notation, fixed segment) for the knots of the Rolfsen table from first to last (inclusive),
+    in the order of the table. The unknot is skipped.
+    """
+    table = get_rolfsen_table()
+    names = list(table)
+    start = names.index(first) if first else 0
+    stop = names.index(last) + 1 if last else len(names)
+    return [(name, table[name], fixed_segment) for name in names[start:stop] if table.get_number_of_crossings(name) > 0]
+
+def get_pd_file_tasks(path, fixed_segment=1):
+    """
+    Tasks from a file with a PD notation on each line, either as json list of 4-tuples
+    or as json object with the keys "pd_notation" and optionally "name" and "fixed_segment".
+    """
+    tasks = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, dict):
+                name = entry.get("name", str(line_number))
+                segment = entry.get("fixed_segment", fixed_segment)
+                entry = entry["pd_notation"]
+            else:
+                name = str(line_number)
+                segment = fixed_segment
+            tasks.append((name, [tuple(crossing) for crossing in entry], segment))
+    return tasks
+
+def get_two_bridge_tasks(normalforms, fixed_segment=1):
+    """
+    Tasks for two-bridge knots given by normal forms, e.g. [[2,3],[1,1,2]].
+    """
+    tasks = []
+    for normalform in normalforms:
+        name = "tb_" + "_".join(str(entry) for entry in normalform)
+        tasks.append((name, TwoBridgeDiagram(normalform).get_pd_notation(), fixed_segment))
+    return tasks
+
+def _run_task(connection, pd_notation, fixed_segment, invariants, memory_limit):
+    """
+    Worker process: computes the invariants one after the other and sends
+    ("result", invariant, value, seconds) for each, ("error", kind, message) on failure and ("done",) at the end.
+    """
+    try:
+        if memory_limit is not None and resource is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        diagram = KnotDiagram(pd_notation)
+        for invariant in invariants:
+            start = time.perf_counter()
+            value = INVARIANTS[invariant](diagram, fixed_segment)
+            connection.send(("result", invariant, value, time.perf_counter() - start))
+    except MemoryError:
+        connection.send(("error", "memory", "MemoryError"))
+    except Exception:
+        connection.send(("error", "error", traceback.format_exc(limit=3)))
+    connection.send(("done",))
+    connection.close()
+
+def run_batch(tasks, invariants, workers=None, timeout=None, memory_limit=None):
+    """
+    Compute the invariants for the tasks (name, pd notation, fixed segment), every task in its own process
+    with at most workers processes at the same time.
+    A task is killed after timeout seconds, memory_limit limits the address space of a task in bytes.
+    Yields a row for every task as soon as it is finished, in the order of completion:
+    {"name", "crossings", "fixed_segment", "status", "results", "timings", "error"}
+    with status "ok", "timeout", "memory" or "error". The results of a task which did not finish
+    contain the invariants computed until then.
+    """
+    for invariant in invariants:
+        if invariant not in INVARIANTS:
+            raise ValueError(f"Unknown invariant: {invariant}, must be one of {', '.join(INVARIANTS)}.")
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    pending = list(reversed(tasks))
+    running = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            name, pd_notation, fixed_segment = pending.pop()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_task, args=(sender, pd_notation, fixed_segment, invariants, memory_limit))
+            process.start()
+            sender.close()
+            row = {"name": name, "crossings": len(pd_notation), "fixed_segment": fixed_segment,
+                   "status": "ok", "results": {}, "timings": {}, "error": None}
+            deadline = None if timeout is None else time.monotonic() + timeout
+            running[receiver] = (process, row, deadline)
+
+        deadlines = [deadline for process, row, deadline in running.values() if deadline is not None]
+        wait_time = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+        for receiver in multiprocessing.connection.wait(list(running), wait_time):
+            process, row, deadline = running[receiver]
+            finished = False
+            try:
+                message = receiver.recv()
+            except EOFError:
+                # the process ended without reporting, e.g. killed by the operating system
+                row["status"] = "error"
+                row["error"] = f"worker exited with code {process.exitcode}"
+                finished = True
+            else:
+                if message[0] == "result":
+                    row["results"][message[1]] = message[2]
+                    row["timings"][message[1]] = message[3]
+                elif message[0] == "error":
+                    row["status"] = message[1]
+                    row["error"] = message[2]
+                else:
+                    finished = True
+            if finished:
+                process.join()
+                receiver.close()
+                del running[receiver]
+                yield row
+
+        now = time.monotonic()
+        for receiver, (process, row, deadline) in list(running.items()):
+            if deadline is not None and now >= deadline:
+                process.kill()
+                process.join()
+                receiver.close()
+                del running[receiver]
+                row["status"] = "timeout"
+                yield row
+
+def write_rows(rows, output):
+    """
+    Write the rows as JSON Lines, flushing after every row.
+    """
+    for row in rows:
+        output.write(json.dumps(row) + "\n")
+        output.flush()
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Compute invariants for a list of knots.")
+    parser.add_argument("--rolfsen", help="range of the Rolfsen table, e.g. 3_1:7_7, 'all' for the whole table")
+    parser.add_argument("--pd-file", help="file with a PD notation on each line")
+    parser.add_argument("--two-bridge", nargs="*", default=[], help="two-bridge normal forms, e.g. 2,3 1,1,2")
+    parser.add_argument("--invariants", default="states,alexander,jones", help=f"comma separated, from: {', '.join(INVARIANTS)}")
+    parser.add_argument("--fixed-segment", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per knot")
+    parser.add_argument("--memory", type=int, default=None, help="memory limit per knot in MB")
+    parser.add_argument("--output", default=None, help="JSON Lines file, default: stdout")
+    args = parser.parse_args(arguments)
+
+    tasks = []
+    if args.rolfsen:
+        if args.rolfsen == "all":
+            first, last = None, None
+        else:
+            first, separator, last = args.rolfsen.partition(":")
+            last = last if separator else first
+        tasks += get_rolfsen_tasks(first or None, last or None, args.fixed_segment)
+    if args.pd_file:
+        tasks += get_pd_file_tasks(args.pd_file, args.fixed_segment)
+    if args.two_bridge:
+        tasks += get_two_bridge_tasks([list(map(int, normalform.split(","))) for normalform in args.two_bridge], args.fixed_segment)
+
+    memory_limit = None if args.memory is None else args.memory*1024*1024
+    rows = run_batch(tasks, args.invariants.split(","), args.workers, args.timeout, memory_limit)
+    if args.output:
+        with open(args.output, "w") as f:
+            write_rows(rows, f)
+    else:
+        write_rows(rows, sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import json
+import sqlite3
+import time
+
+from src.knotdiagram import KnotDiagram
+
+# results which do not depend on the labels of the segments, if the fixed segment is relabeled accordingly;
+# the canonical form keeps the orientations of the components of a link, which the Jones polynomial depends on
+LABEL_INVARIANT_RESULTS = ("number_of_states", "rank_sizes", "jones_polynomial", "kauffman_bracket")
+
+def get_cache_key(pd_notation, fixed_segment):
+    """
+    Canonical hash of the diagram and the label of the fixed segment in the canonical form.
+    """
+    diagram = KnotDiagram([tuple(crossing) for crossing in pd_notation])
+    return diagram.canonical_hash() + f":{diagram.get_canonical_segment(fixed_segment)}"
+
+class InvariantCache:
+    """
+    Persistent cache for the results of compute_lattice_data in a SQLite file.
+    The entries are keyed by the canonical form of the diagram (KnotDiagram.canonical_form)
+    and the label of the fixed segment in the canonical form.
+    For an equivalent diagram with other labels only the LABEL_INVARIANT_RESULTS are returned,
+    all results only if the PD notation and the fixed segment are the stored ones.
+    If the stored results exceed max_bytes the least recently used entries are removed.
+    """
+    def __init__(self, path, max_bytes=64*1024*1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, pd_notation TEXT, fixed_segment INTEGER, "
+            "data TEXT, size INTEGER, last_access REAL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        self.connection.commit()
+
+    def get(self, pd_notation, fixed_segment):
+        """
+        Returns the cached results which are valid for the input as dict, empty if nothing is cached.
+        """
+        key = get_cache_key(pd_notation, fixed_segment)
+        row = self.connection.execute(
+            "SELECT pd_notation, fixed_segment, data FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return {}
+        self.connection.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        stored_pd_notation, stored_fixed_segment, data = row
+        results = json.loads(data)
+        if stored_pd_notation == repr([tuple(crossing) for crossing in pd_notation]) and stored_fixed_segment == fixed_segment:
+            return results
+        return {field: results[field] for field in LABEL_INVARIANT_RESULTS if field in results}
+
+    def put(self, pd_notation, fixed_segment, results):
+        """
+        Store the results of a PD notation and fixed segment.
+        """
+        key = get_cache_key(pd_notation, fixed_segment)
+        data = json.dumps(results)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+            (key, repr([tuple(crossing) for crossing in pd_notation]), fixed_segment, data, len(data), time.time())
+        )
+        self._evict()
+        self.connection.commit()
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the stored results fit into max_bytes.
+        """
+        total_size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        for key, size in self.connection.execute("SELECT key, size FROM results ORDER BY last_access").fetchall():
+            self.connection.execute("DELETE FROM results WHERE key = ?", (key,))
+            total_size -= size
+            if total_size <= self.max_bytes:
+                break
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
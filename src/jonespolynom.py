@@ -103,3 +103,165 @@ class JonesState:
         
 
 
+class SegmentUnionFind:
+    """
+    Union-find over the segments of a diagram which can undo its unions.
+    Union by size without path compression, so every union can be rolled back.
+    """
+    def __init__(self, number_of_segments):
+        self.parent = list(range(number_of_segments+1))
+        self.size = [1]*(number_of_segments+1)
+        self.number_of_components = number_of_segments
+        self.history = []
+
+    def find(self, segment):
+        while self.parent[segment] != segment:
+            segment = self.parent[segment]
+        return segment
+
+    def union(self, segment_a, segment_b):
+        root_a = self.find(segment_a)
+        root_b = self.find(segment_b)
+        if root_a == root_b:
+            self.history.append(None)
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        self.number_of_components -= 1
+        self.history.append((root_a, root_b))
+
+    def rollback(self):
+        """
+        Undo the last union.
+        """
+        last_union = self.history.pop()
+        if last_union is None:
+            return
+        root_a, root_b = last_union
+        self.parent[root_b] = root_b
+        self.size[root_a] -= self.size[root_b]
+        self.number_of_components += 1
+
+
+def get_state_counts(diagram):
+    """
+    Count the states of the Kauffman bracket by their number of A-labels and circles.
+    The labels are chosen crossing after crossing in a depth first enumeration, the A-label first.
+    The circles are the components of a union-find over the segments: choosing a label joins the segments
+    of its smoothing and the union is rolled back when the choice is left, so the circles are never traced.
+    Going from one state to the next undoes the smoothings below the last crossing whose label changes,
+    every node of the choice tree is entered once, which is 2^(n+1) - 1 choices for n crossings.
+
+    Returns dict (number of A-labels, number of circles) -> number of states
+    """
+    splits = []
+    for crossing in diagram.crossings:
+        segments = crossing.segments
+        a_split = ((segments[0],segments[1]),(segments[2],segments[3]))
+        b_split = ((segments[1],segments[2]),(segments[3],segments[0]))
+        splits.append((a_split, b_split))
+
+    union_find = SegmentUnionFind(diagram.number_of_segments)
+    counts = {}
+
+    def choose_label(crossing_id, number_of_A_labels):
+        if crossing_id == diagram.number_of_crossings:
+            key = (number_of_A_labels, union_find.number_of_components)
+            counts[key] = counts.get(key, 0) + 1
+            return
+        for label, split in enumerate(splits[crossing_id]):
+            for segment_a, segment_b in split:
+                union_find.union(segment_a, segment_b)
+            choose_label(crossing_id+1, number_of_A_labels + (label == 0))
+            union_find.rollback()
+            union_find.rollback()
+
+    choose_label(0, 0)
+    return counts
+
+
+def get_crossing_order(diagram):
+    """
+    Order the crossings such that the boundary of the processed crossings stays small.
+    Starting with the first crossing, the next crossing is the one sharing the most segments
+    with the boundary, ties are broken by the size of the new boundary.
+    """
+    remaining = list(range(diagram.number_of_crossings))
+    order = []
+    boundary = set()
+    while remaining:
+        best = None
+        for crossing_id in remaining:
+            segments = diagram.crossings[crossing_id].segments
+            shared = sum(1 for segment in segments if segment in boundary)
+            new_boundary = len(boundary.symmetric_difference(segments))
+            key = (-shared, new_boundary)
+            if best is None or key < best[0]:
+                best = (key, crossing_id)
+        crossing_id = best[1]
+        remaining.remove(crossing_id)
+        order.append(crossing_id)
+        for segment in diagram.crossings[crossing_id].segments:
+            if segment in boundary:
+                boundary.remove(segment)
+            else:
+                boundary.add(segment)
+    return order
+
+
+def _add_strand(ends, segment_a, segment_b):
+    """
+    Join two segments by a strand of a smoothing. ends maps the segments at the
+    open ends of the strands to the segment at the other end of the strand.
+    Returns True if a circle was closed.
+    """
+    if segment_a == segment_b:
+        return True
+    if ends.get(segment_a) == segment_b:
+        del ends[segment_a]
+        del ends[segment_b]
+        return True
+    end_a = ends.pop(segment_a) if segment_a in ends else segment_a
+    end_b = ends.pop(segment_b) if segment_b in ends else segment_b
+    ends[end_a] = end_b
+    ends[end_b] = end_a
+    return False
+
+
+def get_state_counts_by_tangles(diagram, order=None):
+    """
+    Count the states of the Kauffman bracket by their number of A-labels and circles, 
+    like get_state_counts, by adding the crossings one at a time.
+    The processed crossings form a tangle, the table maps each way of connecting the open
+    ends of the tangle (a matching of boundary segments) to the counts of its partial states.
+    The cost is exponential only in the size of the boundary, which is kept small by the crossing order.
+
+    Returns dict (number of A-labels, number of circles) -> number of states
+    """
+    if order is None:
+        order = get_crossing_order(diagram)
+    table = {(): {(0, 0): 1}}
+    for crossing_id in order:
+        segments = diagram.crossings[crossing_id].segments
+        a_split = ((segments[0],segments[1]),(segments[2],segments[3]))
+        b_split = ((segments[1],segments[2]),(segments[3],segments[0]))
+        next_table = {}
+        for matching, counts in table.items():
+            for is_A_label, split in ((1, a_split), (0, b_split)):
+                ends = {}
+                for segment_a, segment_b in matching:
+                    ends[segment_a] = segment_b
+                    ends[segment_b] = segment_a
+                closed_circles = 0
+                for segment_a, segment_b in split:
+                    closed_circles += _add_strand(ends, segment_a, segment_b)
+                next_matching = tuple(sorted((a, b) for a, b in ends.items() if a < b))
+                next_counts = next_table.setdefault(next_matching, {})
+                for (number_of_A_labels, number_of_circles), count in counts.items():
+                    key = (number_of_A_labels + is_A_label, number_of_circles + closed_circles)
+                    next_counts[key] = next_counts.get(key, 0) + count
+        table = next_table
+    return table.get((), {})
+
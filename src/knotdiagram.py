@@ -1,10 +1,59 @@
+import hashlib
+from fractions import Fraction
 from random import randint
 
 from src.kstate import KauffmanState
 from src.lattice import StateLattice
-from src.jonespolynom import JonesState
+from src.alexanderpolynom import get_alexander_polynom_by_determinant, has_consistent_orientation
+from src.jonespolynom import get_state_counts, get_state_counts_by_tangles
 from src.polynom import LaurentPolynom, MultivariatePolynom
 
+def is_label_step_forward(segment, next_segment):
+    """
+    True if a strand from segment to next_segment runs along the orientation given by the labels:
+    the label increases by one or jumps back to the start of the component, like in Crossing.get_sign.
+    """
+    if abs(next_segment - segment) == 1:
+        return next_segment > segment
+    return next_segment < segment
+
+def get_least_rotation(word):
+    """
+    Index at which the lexicographically smallest rotation of the word starts (Booth's algorithm, linear time).
+    """
+    doubled = word + word
+    failure = [-1]*len(doubled)
+    k = 0
+    for j in range(1, len(doubled)):
+        letter = doubled[j]
+        i = failure[j-k-1]
+        while i != -1 and letter != doubled[k+i+1]:
+            if letter < doubled[k+i+1]:
+                k = j-i-1
+            i = failure[i]
+        if letter != doubled[k+i+1]:
+            if letter < doubled[k]:
+                k = j
+            failure[j-k] = -1
+        else:
+            failure[j-k] = i+1
+    return k
+
+def get_period(word):
+    """
+    Smallest p such that rotating the word by p gives the same word.
+    """
+    prefix = [0]*len(word)
+    for i in range(1, len(word)):
+        j = prefix[i-1]
+        while j > 0 and word[i] != word[j]:
+            j = prefix[j-1]
+        if word[i] == word[j]:
+            j += 1
+        prefix[i] = j
+    period = len(word) - prefix[-1] if word else 1
+    return period if len(word) % period == 0 else len(word)
+
 class Region:
     def __init__(self,segments):
         """
@@ -118,6 +167,45 @@ class KnotDiagram:
         self.number_of_regions = self.number_of_crossings + 2
         self.number_of_segments = 2*self.number_of_crossings
         self.segments = [i+1 for i in range(self.number_of_segments)]
+        self._build_incidence_index()
+        # region table, traced on first use
+        self.regions = None
+        self._corner_regions = None
+        self._canonical_form = None
+        self._canonical_segment_maps = None
+
+    def _build_incidence_index(self):
+        """
+        Index the incidence of segments and crossings once, so that the crossings
+        at a segment and the neighbouring crossings can be looked up without scanning.
+
+        segment_incidence: segment -> tuple of (crossing id, position) where the segment occurs
+        crossing_neighbours: crossing id -> for each position the (crossing id, position) 
+            at the other end of the segment, None if there is no other end
+        transposition_masks: segment -> bitset of the segments at the crossings containing the segment, bit s for segment s,
+            the segments whose transposability can change by a transposition at the segment
+        """
+        incidence = {segment: [] for segment in self.segments}
+        for crossing in self.crossings:
+            for position, segment in enumerate(crossing.segments):
+                incidence.setdefault(segment, []).append((crossing.id, position))
+        self.segment_incidence = {segment: tuple(slots) for segment, slots in incidence.items()}
+
+        self.crossing_neighbours = [[None]*4 for crossing in self.crossings]
+        self._segment_crossings = {}
+        for segment, slots in self.segment_incidence.items():
+            if len(slots) == 2:
+                (c0, p0), (c1, p1) = slots
+                self.crossing_neighbours[c0][p0] = (c1, p1)
+                self.crossing_neighbours[c1][p1] = (c0, p0)
+            crossing_ids = []
+            for crossing_id, position in slots:
+                if crossing_id not in crossing_ids:
+                    crossing_ids.append(crossing_id)
+            self._segment_crossings[segment] = [self.crossings[i] for i in crossing_ids]
+        crossing_masks = [sum(1 << segment for segment in set(crossing.segments)) for crossing in self.crossings]
+        self.transposition_masks = {segment: crossing_masks[crossings[0].id] | crossing_masks[crossings[-1].id]
+                                    for segment, crossings in self._segment_crossings.items() if crossings}
 
     def __repr__(self):
         knot_string="Knot:\n"
@@ -127,13 +215,182 @@ class KnotDiagram:
 
     def get_pd_notation(self):
         return self.pd_notation
+
+    def _traverse_component(self, start, labels):
+        """
+        Follow the strand entering a crossing at start = (crossing id, position) until it closes
+        and append the entering positions to labels, which maps (crossing id, position) -> new segment label.
+        Returns False if the strand has an open end.
+        """
+        dart = start
+        while True:
+            labels[dart] = len(labels) + 1
+            crossing_id, position = dart
+            dart = self.crossing_neighbours[crossing_id][(position + 2) % 4]
+            if dart is None:
+                return False
+            if dart == start:
+                return True
+
+    def _get_dart_orientations(self):
+        """
+        Entering position (crossing id, position) -> True if following the strand from there runs along
+        the orientation of its component in the PD notation, None if a strand has an open end.
+        As in Crossing.get_sign a component is oriented such that the labels of its segments increase by one,
+        except at the step from its largest label back to its smallest.
+        """
+        orientations = {}
+        for crossing in self.crossings:
+            for position in range(4):
+                if (crossing.id, position) in orientations:
+                    continue
+                labels = {}
+                if not self._traverse_component((crossing.id, position), labels):
+                    return None
+                increasing = 0
+                for crossing_id, entering in labels:
+                    segments = self.crossings[crossing_id].segments
+                    increasing += 1 if is_label_step_forward(segments[entering], segments[(entering + 2) % 4]) else -1
+                forward = increasing >= 0
+                for crossing_id, entering in labels:
+                    orientations[(crossing_id, entering)] = forward
+                    orientations[(crossing_id, (entering + 2) % 4)] = not forward
+        return orientations
+
+    def _get_relabelings(self, start):
+        """
+        Relabelings of the segments obtained by following the knot from the entering position start.
+        Every further component of a link is started at the first crossing (in the new labels) where
+        it meets the labeled components. Its orientation is the one of the PD notation if the first component
+        is followed along its orientation and reversed otherwise, so only all components together are reversed:
+        reversing a single component changes the signs of its crossings with the other components.
+        Returns a list of dicts (crossing id, entering position) -> new segment label.
+        """
+        orientations = self._get_dart_orientations()
+        labels = {}
+        if orientations is None or not self._traverse_component(start, labels):
+            return []
+        forward = orientations[start]
+        while True:
+            next_start = None
+            for (crossing_id, position), label in sorted(labels.items(), key=lambda item: item[1]):
+                other = [(crossing_id, (position + 1) % 4), (crossing_id, (position + 3) % 4)]
+                if all(dart not in labels for dart in other):
+                    next_start = other[0] if orientations[other[0]] == forward else other[1]
+                    break
+            if next_start is None:
+                if len(labels) < self.number_of_segments:
+                    # split diagram, the further components cannot be reached
+                    return []
+                return [labels]
+            self._traverse_component(next_start, labels)
+
+    def _get_relabeled_pd(self, labels):
+        """
+        PD notation in the new labels, every crossing rotated such that the incoming under segment is at position 0,
+        with the crossings sorted. Returns the PD notation and the map old segment -> new segment.
+        """
+        segment_map = {}
+        for (crossing_id, position), label in labels.items():
+            segment_map[self.crossings[crossing_id].segments[position]] = label
+        pd_notation = []
+        for crossing in self.crossings:
+            rotation = 0 if (crossing.id, 0) in labels else 2
+            pd_notation.append(tuple(segment_map[crossing.segments[(rotation + i) % 4]] for i in range(4)))
+        return sorted(pd_notation), segment_map
+
+    def _get_gauss_word(self, start):
+        """
+        Word of the knot traversed from start, a letter for every entering position:
+        (over or under, distance to the other passage through the same crossing).
+        The word does not depend on the labels, so its least rotation selects the start positions to compare.
+        """
+        labels = {}
+        self._traverse_component(start, labels)
+        darts = list(labels)
+        visits = {}
+        for i, (crossing_id, position) in enumerate(darts):
+            visits.setdefault(crossing_id, []).append(i)
+        word = []
+        for i, (crossing_id, position) in enumerate(darts):
+            other = visits[crossing_id][0] if visits[crossing_id][0] != i else visits[crossing_id][-1]
+            word.append((position % 2, (other - i) % len(darts)))
+        return word, darts
+
+    def _get_start_candidates(self):
+        """
+        Entering positions from which the canonical form has to be searched.
+        For a knot only the starts with the least rotation of the Gauss word in both orientations,
+        for links and diagrams with open strands all entering positions.
+        """
+        if not self.crossings:
+            return []
+        all_starts = [(crossing.id, position) for crossing in self.crossings for position in range(4)]
+        forward = self._get_gauss_word((0, 0))
+        backward = self._get_gauss_word((0, 2))
+        if len(forward[1]) != self.number_of_segments:
+            return all_starts
+        candidates = []
+        for word, darts in (forward, backward):
+            k = get_least_rotation(word)
+            period = get_period(word)
+            rotation = word[k:] + word[:k]
+            candidates.append((rotation, [darts[(k + j*period) % len(darts)] for j in range(len(darts)//period)]))
+        least = min(rotation for rotation, starts in candidates)
+        return [start for rotation, starts in candidates if rotation == least for start in starts]
+
+    def _compute_canonical_form(self):
+        best = None
+        segment_maps = []
+        for start in self._get_start_candidates():
+            for labels in self._get_relabelings(start):
+                pd_notation, segment_map = self._get_relabeled_pd(labels)
+                if best is None or pd_notation < best:
+                    best = pd_notation
+                    segment_maps = [segment_map]
+                elif pd_notation == best:
+                    segment_maps.append(segment_map)
+        if best is None:
+            # no closed strands to follow, only the order of the crossings is normalized
+            best = sorted(tuple(crossing) for crossing in self.pd_notation)
+            segment_maps = [{segment: segment for segment in self.segments}]
+        self._canonical_form = best
+        self._canonical_segment_maps = segment_maps
+
+    def canonical_form(self):
+        """
+        Canonical PD notation of the diagram: the same for all PD notations of the diagram which differ
+        by the labels of the segments, the order of the crossings, the orientation of the knot
+        (for a link reversing all components at once) and rotating a crossing by two positions.
+        The segments are relabeled along the knot from every start and in both orientations
+        (for a knot only from the starts with the least Gauss word), every crossing is rotated
+        such that the incoming under segment is at position 0 and the smallest sorted PD notation is chosen.
+        Rotations of a crossing by one position exchange over and under and are not normalized.
+        """
+        if self._canonical_form is None:
+            self._compute_canonical_form()
+        return list(self._canonical_form)
+
+    def canonical_hash(self):
+        """
+        Hash of the canonical form as hex string.
+        """
+        return hashlib.md5(repr(self.canonical_form()).encode()).hexdigest()
+
+    def get_canonical_segment(self, segment):
+        """
+        Label of a segment in the canonical form. If symmetries of the diagram give several relabelings
+        to the canonical form, the smallest label is returned, so equivalent segments have the same label.
+        """
+        self.canonical_form()
+        return min(segment_map[segment] for segment_map in self._canonical_segment_maps)
     
     def get_crossings_containing_segment(self,segment):
-        crossing_containg_the_segment = []
-        for crossing in self.crossings:
-            if segment in crossing.segments:
-                crossing_containg_the_segment.append(crossing)
-        return crossing_containg_the_segment
+        """
+        Returns the list of crossings containing the segment, in the order of the crossings.
+        The list is shared with the incidence index and must not be modified.
+        """
+        return self._segment_crossings.get(segment, [])
 
     def get_crossing_from_arrow(self,arrow):
         possible_crossings = self.get_crossings_containing_segment(arrow[0])
@@ -159,46 +416,103 @@ class KnotDiagram:
 
         return f"Quiver( {number_of_vertices}, {arrows})"
     
-    def get_region(self, crossing_id, region_id):
+    def _trace_region(self, crossing_id, region_id):
         """
-        Reconstruct the region adjacent to a given crossing at a specific marker position.
-        
-        Parameters:
-            crossing_id (int): Index of the starting crossing in self.crossings.
-            region_id (int): Marker position (0 to 3) on that crossing.
-            
-        Returns:
-            Region: The region bounded by segments traced from that marker.
+        Trace the region adjacent to a crossing at a marker position.
+        Returns the bounding segments and the corners (crossing id, marker position) of the region,
+        the k-th corner is the one at which the trace from the k-th segment would start.
         """
-        boundary = []
-        visited_segments = set()
-
         crossing = self.crossings[crossing_id]
         segment = crossing.segments[region_id]
-        current_segment = segment
-        current_crossing = crossing
-
-        visited_segments.add(current_segment)
-        boundary.append(current_segment)
+        boundary = [segment]
+        corners = [(crossing_id, region_id)]
+        current_id = crossing_id
+        position = region_id
 
         while True:
 
             # Step to the next segment in counterclockwise direction
-            next_segment = current_crossing.counterclockwise_next(current_segment)
+            position = (position + 1) % 4
+            next_segment = self.crossings[current_id].segments[position]
             if next_segment == segment:
                 break  # Completed the loop
             boundary.append(next_segment)
 
-            # Now find the next crossing that shares this segment
-            for next_c in self.crossings:
-                if next_c != current_crossing and next_segment in next_c.segments:
-                    current_crossing = next_c
-                    # determine the position of the segment in next_c to continue
-                    current_segment = next_segment
-                    break
-            else:
+            # Now continue at the other crossing of this segment
+            neighbour = self.crossing_neighbours[current_id][position]
+            if neighbour is None or neighbour[0] == current_id:
                 raise ValueError(f"No next crossing found for segment {next_segment}")
-        return Region(tuple(boundary))
+            current_id, position = neighbour
+            corners.append(neighbour)
+        return boundary, corners
+
+    def _build_region_table(self):
+        """
+        Trace every region of the diagram once.
+
+        regions: region id -> Region
+        corner_regions: crossing id -> region id for each marker position
+        corner_offsets: crossing id -> for each marker position the index of the 
+            segment in the bounding segments of the region where the trace of the corner starts
+        segment_regions: segment -> ids of the regions bounded by the segment
+        """
+        self.regions = []
+        self._corner_regions = [[None]*4 for crossing in self.crossings]
+        self._corner_offsets = [[None]*4 for crossing in self.crossings]
+        self._segment_regions = {segment: () for segment in self.segments}
+        for crossing_id in range(self.number_of_crossings):
+            for region_id in range(4):
+                if self._corner_regions[crossing_id][region_id] is not None:
+                    continue
+                boundary, corners = self._trace_region(crossing_id, region_id)
+                table_id = len(self.regions)
+                self.regions.append(Region(tuple(boundary)))
+                for offset, (c, r) in enumerate(corners):
+                    self._corner_regions[c][r] = table_id
+                    self._corner_offsets[c][r] = offset
+                for segment in set(boundary):
+                    self._segment_regions[segment] = self._segment_regions.get(segment, ()) + (table_id,)
+
+    def _ensure_region_table(self):
+        if self._corner_regions is None:
+            self._build_region_table()
+
+    def get_regions(self):
+        """
+        Returns the list of all regions, the index of a region is its region id.
+        """
+        self._ensure_region_table()
+        return self.regions
+
+    def get_region_id(self, crossing_id, region_id):
+        """
+        Returns the id of the region adjacent to a crossing at a marker position (0 to 3).
+        """
+        self._ensure_region_table()
+        return self._corner_regions[crossing_id][region_id]
+
+    def get_segment_regions(self, segment):
+        """
+        Returns the ids of the regions which have the segment in their boundary.
+        """
+        self._ensure_region_table()
+        return self._segment_regions.get(segment, ())
+
+    def get_region(self, crossing_id, region_id):
+        """
+        Reconstruct the region adjacent to a given crossing at a specific marker position.
+        
+        Parameters:
+            crossing_id (int): Index of the starting crossing in self.crossings.
+            region_id (int): Marker position (0 to 3) on that crossing.
+            
+        Returns:
+            Region: The region bounded by segments traced from that marker.
+        """
+        self._ensure_region_table()
+        boundary = self.regions[self._corner_regions[crossing_id][region_id]].bounding_segments
+        offset = self._corner_offsets[crossing_id][region_id]
+        return Region(boundary[offset:] + boundary[:offset])
 
     def get_kstate_greedy(self,segment):
         """
@@ -208,16 +522,14 @@ class KnotDiagram:
         """
         # list of marker positions
         marker_positions = []
-        # marked regions
-        marked_regions = []
+        # marked regions, the regions at the segment are excluded from the start
+        marked_regions = set(self.get_segment_regions(segment))
         for crossing_id,crossing in enumerate(self.crossings):
             for region_id in range(4):
-                region = self.get_region(crossing_id,region_id)
-                if segment in region.bounding_segments:
-                    continue
+                region = self.get_region_id(crossing_id,region_id)
                 if region in marked_regions:
                     continue
-                marked_regions.append(region)
+                marked_regions.add(region)
                 marker_positions.append(region_id)
                 break
         
@@ -233,22 +545,20 @@ class KnotDiagram:
         """
         # list of marker positions
         marker_positions = []
-        # marked regions
-        marked_regions = []
+        segment_regions = self.get_segment_regions(segment)
+        corner_regions = [[self.get_region_id(crossing_id,region_id) for region_id in range(4)] for crossing_id in range(self.number_of_crossings)]
         while retries > 0 and len(marker_positions) != self.number_of_crossings:
             retries -= 1
             marker_positions = []
-            marked_regions = []
-            for crossing_id,crossing in enumerate(self.crossings):
+            marked_regions = set(segment_regions)
+            for crossing_id in range(self.number_of_crossings):
                 randomized_start_region = randint(0,3)
                 for i in range(randomized_start_region,randomized_start_region+4):
                     region_id = i % 4
-                    region = self.get_region(crossing_id,region_id)
-                    if segment in region.bounding_segments:
-                        continue
+                    region = corner_regions[crossing_id][region_id]
                     if region in marked_regions:
                         continue
-                    marked_regions.append(region)
+                    marked_regions.add(region)
                     marker_positions.append(region_id)
                     break
         if len(marker_positions) != self.number_of_crossings:
@@ -264,8 +574,66 @@ class KnotDiagram:
         while not KauffmanState._is_valid_state(self,marker_positions, segment):
             # increment marker positions
             for i in range(self.number_of_crossings):
-                x = (marker_positions[i]+1)%4
-                if x != 0:
+                marker_positions[i] = (marker_positions[i]+1)%4
+                if marker_positions[i] != 0:
+                    break
+            else:
+                raise ValueError("No Kauffman state with no markers at the segment exists")
+        return KauffmanState.from_marker_positions(self, marker_positions)
+
+    def get_kstate_matching(self,segment):
+        """
+        Get a Kauffman state of the knot diagram with no markers in the regions adjacent to the segment.
+        A Kauffman state is a perfect matching between the crossings and the regions not adjacent to the segment,
+        the matching is found deterministically with augmenting paths.
+        """
+        excluded_regions = set(self.get_segment_regions(segment))
+        candidates = []
+        for crossing_id in range(self.number_of_crossings):
+            regions = []
+            for region_id in range(4):
+                region = self.get_region_id(crossing_id,region_id)
+                if region not in excluded_regions and region not in regions:
+                    regions.append(region)
+            candidates.append(regions)
+
+        crossing_match = [None]*self.number_of_crossings
+        region_match = {}
+        for start in range(self.number_of_crossings):
+            # search an augmenting path starting at the unmatched crossing
+            reached_from = {}
+            stack = [(start, iter(candidates[start]))]
+            free_region = None
+            while stack and free_region is None:
+                crossing_id, regions = stack[-1]
+                for region in regions:
+                    if region in reached_from:
+                        continue
+                    reached_from[region] = crossing_id
+                    if region not in region_match:
+                        free_region = region
+                    else:
+                        matched_crossing = region_match[region]
+                        stack.append((matched_crossing, iter(candidates[matched_crossing])))
+                    break
+                else:
+                    stack.pop()
+            if free_region is None:
+                raise ValueError("No Kauffman state with no markers at the segment exists")
+            # flip the matching along the path
+            region = free_region
+            while region is not None:
+                crossing_id = reached_from[region]
+                previous_region = crossing_match[crossing_id]
+                crossing_match[crossing_id] = region
+                region_match[region] = crossing_id
+                region = previous_region
+
+        marker_positions = []
+        for crossing_id, region in enumerate(crossing_match):
+            for region_id in range(4):
+                if self.get_region_id(crossing_id,region_id) == region:
+                    marker_positions.append(region_id)
                     break
         return KauffmanState.from_marker_positions(self, marker_positions)
                     
@@ -275,7 +643,7 @@ class KnotDiagram:
     def is_segment_from_under_to_over(self, segment):
         """
         This method returns True if the segment goes from an under-crossing to an over-crossing."""
-        segment_positions = [crossing.segments.index(segment) for crossing in self.crossings if segment in crossing.segments]
+        segment_positions = [position for crossing_id, position in self.segment_incidence.get(segment, ())]
         if not 2 in segment_positions:
             return False
         segment_positions.remove(2)
@@ -286,7 +654,7 @@ class KnotDiagram:
     def is_segment_from_over_to_under(self, segment):
         """
         This method returns True if the segment goes from an over-crossing to an under-crossing."""
-        segment_positions = [crossing.segments.index(segment) for crossing in self.crossings if segment in crossing.segments]
+        segment_positions = [position for crossing_id, position in self.segment_incidence.get(segment, ())]
         if not 0 in segment_positions:
             return False
         segment_positions.remove(0)
@@ -317,10 +685,21 @@ class KnotDiagram:
         """
         return StateLattice(self,segment)
 
-    def get_alexander_polynom(self):
+    def get_alexander_polynom(self, method="lattice"):
         """
         returns a LaurentPolynom object
+
+        method: "lattice" specializes the f-polynomial of the state lattice,
+            "determinant" evaluates the clock matrix of the crossings and regions in polynomial time.
+        Both use the fixed segment 1. The determinant is only used for a knot whose strand runs
+        under and over every crossing once (has_consistent_orientation), for other diagrams
+        the crossing signs can differ from the lattice path and the lattice is used instead.
         """
+        if method not in ("lattice", "determinant"):
+            raise ValueError("Invalid method: must be 'determinant' or 'lattice'.")
+        if method == "determinant" and has_consistent_orientation(self):
+            minimal_state = StateLattice(self, 1, build=False).get_minimal_state()
+            return get_alexander_polynom_by_determinant(self, minimal_state, 1)
         lattice = self.get_lattice(1)
         f_pol = lattice.get_f_polynomial()
         specialization = self.get_alexander_specialization()
@@ -329,12 +708,24 @@ class KnotDiagram:
     def get_kauffman_bracket_specialization(self):
         return [LaurentPolynom([[1,1]]),LaurentPolynom([[1,-1]]), LaurentPolynom([[-1,2],[-1,-2]])]
 
-    def get_kauffman_bracket(self):
+    def get_kauffman_bracket(self, method="tangles"):
+        """
+        Kauffman bracket normalized by the twist number. The states are aggregated by their
+        number of A-labels and circles, so each (#A, #circles) pair gives one monomial.
+
+        method: "tangles" adds the crossings one by one and is exponential only in the width of the diagram,
+            "states" enumerates all 2^n states.
+        """
+        if method == "tangles":
+            state_counts = get_state_counts_by_tangles(self)
+        elif method == "states":
+            state_counts = get_state_counts(self)
+        else:
+            raise ValueError("Invalid method: must be 'tangles' or 'states'.")
         kauffman_bracket = []
-        for i in range(2**self.number_of_crossings):
-            state = JonesState.from_integer(self.number_of_crossings,i)
-            state_polynom = state.get_monomial_of_state(self)
-            kauffman_bracket.append(state_polynom)
+        for (number_of_A_labels, number_of_circles), count in state_counts.items():
+            number_of_B_labels = self.number_of_crossings - number_of_A_labels
+            kauffman_bracket.append([count, number_of_A_labels, number_of_B_labels, number_of_circles-1])
         unspecialized_kauffman_bracket = MultivariatePolynom(kauffman_bracket)
         result = unspecialized_kauffman_bracket.specialize_to_laurent(self.get_kauffman_bracket_specialization())
         twist = self.get_twist_number()
@@ -348,7 +739,8 @@ class KnotDiagram:
         result.simplify()
         return result
 
-    def get_jones_polynom(self):
-        kauffman_polynom = self.get_kauffman_bracket()
-        specialization = LaurentPolynom([[1,-0.25]])
+    def get_jones_polynom(self, method="tangles"):
+        kauffman_polynom = self.get_kauffman_bracket(method)
+        # A = t^(-1/4) with an exact exponent
+        specialization = LaurentPolynom([[1,Fraction(-1,4)]])
         return kauffman_polynom.get_specialization(specialization)
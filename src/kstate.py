@@ -29,7 +29,7 @@ class TranspositionSequence:
         unique_transpositions = []
         transpositions = self.string.split(",")
         for transposition in transpositions:
-            if not transposition in unique_transpositions:
+            if not int(transposition) in unique_transpositions:
                 unique_transpositions.append(int(transposition))
         return unique_transpositions
 
@@ -72,22 +72,61 @@ class StateNode:
 
         
 class KauffmanState:
-    def __init__(self, marker_positions):
+    """
+    Kauffman state of a knot diagram.
+    The marker positions are stored as bytes indexed by crossing id, 
+    the crossings themselves are shared with the knot diagram.
+
+    The segments at which a transposition is possible are kept as bitsets (bit s for segment s),
+    computed on first use. Whether a segment is transposable depends only on the markers of its two crossings,
+    so a transposed state takes over the bitsets and only rechecks the segments at the two changed crossings.
+    """
+    __slots__ = ("diagram", "markers", "_hash", "_transposable")
+
+    def __init__(self, marker_positions, diagram=None):
+        """
+        marker_positions: marker position (0–3) for each crossing id,
+            or dict mapping Crossing to marker position (0–3)
+        diagram: KnotDiagram the state belongs to
+        """
+        if isinstance(marker_positions, dict):
+            if diagram is None:
+                from src.knotdiagram import KnotDiagram
+                diagram = KnotDiagram([crossing.segments for crossing in marker_positions])
+                marker_positions = list(marker_positions.values())
+            else:
+                marker_positions = [marker_positions[crossing] for crossing in diagram.crossings]
+        self.diagram = diagram
+        self.markers = bytes(marker_positions)
+        self._hash = hash(self.markers)
+        # (cw bitset, ccw bitset, bitset of the segments to recheck), the bitsets are None until used
+        self._transposable = None
+
+    @classmethod
+    def _from_markers(cls, diagram, markers, transposable=None):
         """
-        marker_positions: dict mapping Crossing to marker position (0–3)
+        Create a state from a bytes object of marker positions without validation.
+        transposable: bitsets of the transposable segments as kept by a state, see get_transposable_state
         """
-        self.marker_positions = marker_positions  # Crossing -> int
+        state = cls.__new__(cls)
+        state.diagram = diagram
+        state.markers = markers
+        state._hash = hash(markers)
+        state._transposable = transposable
+        return state
 
     @classmethod
     def from_marker_positions(cls,diagram,marker_positions):
         if not cls._is_valid_state(diagram, marker_positions):
             raise ValueError("Invalid Kauffman state: each crossing must map to a single valid marker position.")
+        return cls(marker_positions, diagram)
 
-        marker_dict = {}
-        for i,crossing in enumerate(diagram.crossings):
-            marker_dict[crossing]=marker_positions[i]
-            
-        return cls(marker_dict)
+    @property
+    def marker_positions(self):
+        """
+        dict mapping Crossing to marker position (0–3)
+        """
+        return dict(zip(self.diagram.crossings, self.markers))
 
     @staticmethod
     def _is_valid_state(diagram, marker_positions, segment=None):
@@ -95,15 +134,15 @@ class KauffmanState:
             return False
         if any([marker not in range(4) for marker in marker_positions]):
             return False
-        regions = [diagram.get_region(i,marker) for i,marker in enumerate(marker_positions)]
-        if len(set(regions)) != diagram.number_of_crossings:
+        regions = {diagram.get_region_id(i,marker) for i,marker in enumerate(marker_positions)}
+        if len(regions) != diagram.number_of_crossings:
             return False
 
         if segment is not None:
             # Check if the segment is part of the crossings
             if segment not in diagram.segments:
                 raise ValueError(f"Segment {segment} is not part of the crossings.")
-            if any([segment in region.bounding_segments for region in regions]):
+            if not regions.isdisjoint(diagram.get_segment_regions(segment)):
                 return False
 
         return True
@@ -114,12 +153,12 @@ class KauffmanState:
         Returns True if a transposition is possible in the specified direction ('cw' or 'ccw'),
         or False if no transposition is possible.
         """
-        segment_crossings = [crossing for crossing in self.marker_positions if segment in crossing.segments]
+        segment_crossings = self.diagram.get_crossings_containing_segment(segment)
         if len(segment_crossings) != 2:
             return False
 
         c0, c1 = segment_crossings
-        m0, m1 = self.marker_positions[c0], self.marker_positions[c1]
+        m0, m1 = self.markers[c0.id], self.markers[c1.id]
 
         # Check
         if direction == 'ccw':
@@ -152,23 +191,19 @@ class KauffmanState:
         """ 
         Returns the transposed Kauffman state.
         Before transposing, make sure that the transposition is possible.
+        Only the markers of the two crossings containing the segment are changed.
         """
-        segment_crossings = [crossing for crossing in self.marker_positions if segment in crossing.segments]
+        segment_crossings = self.diagram.get_crossings_containing_segment(segment)
         if len(segment_crossings) != 2:
             raise ValueError("Invalid segment: must be part of exactly two crossings.")
 
         c0, c1 = segment_crossings
-        m0, m1 = self.marker_positions[c0], self.marker_positions[c1]
-        new_positions = self.marker_positions.copy()
+        m0, m1 = self.markers[c0.id], self.markers[c1.id]
 
         if direction == 'ccw':
-            new_positions[c0] = (m0 + 1) % 4
-            new_positions[c1] = (m1 + 1) % 4
-            return KauffmanState(new_positions)
+            step = 1
         elif direction == 'cw':
-            new_positions[c0] = (m0 - 1) % 4
-            new_positions[c1] = (m1 - 1) % 4
-            return KauffmanState(new_positions)
+            step = -1
         elif direction == "possible":
             pos=self.get_transposition_type(segment)
             if pos == 'cw':
@@ -178,25 +213,87 @@ class KauffmanState:
             return self
         else:
             raise ValueError("Invalid direction: must be 'cw' or 'ccw'.")
+        new_markers = bytearray(self.markers)
+        new_markers[c0.id] = (m0 + step) % 4
+        new_markers[c1.id] = (m1 + step) % 4
+        state = KauffmanState._from_markers(self.diagram, bytes(new_markers))
+        if self._transposable is not None:
+            cw, ccw, changed = self._transposable
+            state._transposable = (cw, ccw, changed | self.diagram.transposition_masks[segment])
+        return state
+
+    def get_transposable_state(self):
+        """
+        The bitsets of the transposable segments as (cw bitset, ccw bitset, bitset of the segments to recheck),
+        None if they are not computed. A state created by _from_markers with them continues the incremental updates.
+        """
+        return self._transposable
+
+    def clear_transposable_segments(self):
+        """
+        Drop the bitsets of the transposable segments, e.g. once all successors of the state are generated.
+        They are computed again when needed.
+        """
+        self._transposable = None
+
+    def _update_transposable_segments(self, segments, direction, changed):
+        """
+        Bitset of the transposable segments, with the segments in the bitset changed checked again.
+        """
+        while changed:
+            bit = changed & -changed
+            if self.is_transposable(bit.bit_length() - 1, direction):
+                segments |= bit
+            else:
+                segments &= ~bit
+            changed ^= bit
+        return segments
+
+    def get_transposable_segments(self, direction):
+        """
+        Bitset of the segments at which a transposition in the direction ('cw' or 'ccw') is possible,
+        bit s is set for segment s.
+        """
+        if direction not in ("cw", "ccw"):
+            raise ValueError("Invalid direction: must be 'cw' or 'ccw'.")
+        cw, ccw, changed = self._transposable or (None, None, 0)
+        if changed:
+            if cw is not None:
+                cw = self._update_transposable_segments(cw, "cw", changed)
+            if ccw is not None:
+                ccw = self._update_transposable_segments(ccw, "ccw", changed)
+        all_segments = (1 << (self.diagram.number_of_segments + 1)) - 2
+        if direction == "cw" and cw is None:
+            cw = self._update_transposable_segments(0, "cw", all_segments)
+        elif direction == "ccw" and ccw is None:
+            ccw = self._update_transposable_segments(0, "ccw", all_segments)
+        self._transposable = (cw, ccw, 0)
+        return cw if direction == "cw" else ccw
 
     def get_all_possible_transpositions(self,direction):
         """
-        Returns a list of all possible transpositions for the current Kauffman state.
+        Returns a list of all possible transpositions for the current Kauffman state, in increasing order.
         """
+        segments = self.get_transposable_segments(direction)
         transpositions = []
-        for segment in range(1, len(self.marker_positions)*2 +1):
-            if self.is_transposable(segment, direction):
-                transpositions.append(segment)
+        while segments:
+            bit = segments & -segments
+            transpositions.append(bit.bit_length() - 1)
+            segments ^= bit
         return transpositions
             
 
     def __eq__(self, other):
-        return isinstance(other, KauffmanState) and self.marker_positions == other.marker_positions
+        if not isinstance(other, KauffmanState) or self.markers != other.markers:
+            return False
+        if self.diagram is other.diagram:
+            return True
+        return (self.diagram is not None and other.diagram is not None 
+                and self.diagram.pd_notation == other.diagram.pd_notation)
 
     # for using KauffmanState as a key in a dictionary
     def __hash__(self):
-        return hash(frozenset(self.marker_positions.items()))
+        return self._hash
 
     def __repr__(self):
-        return f"{', '.join(f'{k}: {k.first_region_segment(v),k.second_region_segment(v)}' for k,v in self.marker_positions.items())}"
-
+        return f"{', '.join(f'{k}: {k.first_region_segment(v),k.second_region_segment(v)}' for k,v in zip(self.diagram.crossings, self.markers))}"
@@ -1,6 +1,121 @@
-from src.kstate import StateNode
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+import mmap as mmap_module
+import struct
+import sys
+
+from src.kstate import KauffmanState, StateNode
 from src.kstate import TranspositionSequence
 import src.polynom
+from src.statecount import get_rank_sizes
+
+MAGIC = b"KSL1"
+# magic, fixed segment, number of crossings, number of nodes, number of edges
+HEADER = struct.Struct("<4sHHII")
+
+def _align(position):
+    """
+    Next multiple of 4, the arrays in a lattice file start at such offsets.
+    """
+    return (position + 3) & ~3
+
+def _to_little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _read_array(buffer, position, typecode, length):
+    """
+    Typed view of length little endian integers at position of the buffer, without copying.
+    Returns the view and the position after it.
+    """
+    size = array(typecode).itemsize*length
+    view = memoryview(buffer)[position:position+size].cast(typecode)
+    if sys.byteorder == "big":
+        view = array(typecode, view)
+        view.byteswap()
+    return view, position + size
+
+# layers with fewer states are expanded in the parent process, sending them to the workers costs more
+PARALLEL_MIN_LAYER_SIZE = 2000
+
+# diagram of the current worker process, set by _init_worker
+_worker_diagram = None
+
+def _init_worker(pd_notation):
+    global _worker_diagram
+    from src.knotdiagram import KnotDiagram
+    _worker_diagram = KnotDiagram(pd_notation)
+
+def _expand_packed_states(chunk):
+    """
+    Worker: counterclockwise successors of the states given by their concatenated marker positions
+    and their bitsets of transposable segments (KauffmanState.get_transposable_state, None if unknown).
+    Returns the number of successors of every state, the transposed segments, the concatenated
+    marker positions of the successors and the bitset of the ccw transposable segments of every state,
+    in the order of the states.
+    """
+    packed_markers, transposables = chunk
+    number_of_crossings = _worker_diagram.number_of_crossings
+    counts = array("H")
+    labels = array("H")
+    successors = bytearray()
+    ccw_segments = []
+    for i, transposable in enumerate(transposables):
+        markers = packed_markers[i*number_of_crossings:(i+1)*number_of_crossings]
+        state = KauffmanState._from_markers(_worker_diagram, markers, transposable)
+        transpositions = state.get_all_possible_transpositions("ccw")
+        ccw_segments.append(state.get_transposable_segments("ccw"))
+        counts.append(len(transpositions))
+        for transposition in transpositions:
+            labels.append(transposition)
+            successors += state.transpose(transposition,"ccw").markers
+    return counts, labels, bytes(successors), ccw_segments
+
+class _MappedNodes(Sequence):
+    """
+    The nodes of a loaded lattice, created from the marker array when they are accessed.
+    The name of a node is the name of its first predecessor extended by the transposed segment,
+    which is how the node was named when the lattice was built.
+    Created nodes are kept, so attributes like the position of the image stay attached.
+    """
+    def __init__(self, lattice, markers):
+        self.lattice = lattice
+        self.markers = markers
+        self.number_of_crossings = lattice.diagram.number_of_crossings
+        self._nodes = {}
+
+    def __len__(self):
+        return len(self.lattice.ranks)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("node id out of range")
+        node = self._nodes.get(index)
+        if node is None:
+            node = StateNode(self.get_state(index), self._get_name(index))
+            self._nodes[index] = node
+        return node
+
+    def get_state(self, node_id):
+        start = node_id*self.number_of_crossings
+        return KauffmanState._from_markers(self.lattice.diagram, bytes(self.markers[start:start+self.number_of_crossings]))
+
+    def _get_name(self, node_id):
+        lattice = self.lattice
+        transpositions = []
+        while node_id != 0:
+            first = lattice.down_offsets[node_id]
+            transpositions.append(str(lattice.down_labels[first]))
+            node_id = lattice.down_targets[first]
+        return ",".join(reversed(transpositions))
 
 class StateLattice:
     """
@@ -14,14 +129,55 @@ class StateLattice:
     - get_f_polynomial_latex: Get the f-polynomial of the lattice in LaTeX format.
     - get_alexander_polynomial: Get the Alexander polynomial of the lattice.
     - get_alexander_polynomial_latex: Get the Alexander polynomial of the lattice in LaTeX format.
+    - iter_states: Stream the states layer by layer without building the lattice.
+    - get_rank_sizes: Number of states in each layer, counted without enumerating the states.
+    - get_successors / get_predecessors: Cover relations of a node id.
+
+    The nodes are identified by their index in nodes. The cover relations are stored in CSR form,
+    for node id i the successors are up_targets[up_offsets[i]:up_offsets[i+1]] with the transposed segments
+    in up_labels at the same positions, the predecessors likewise in down_offsets, down_targets and down_labels.
+    The arrays support the buffer protocol, so e.g. numpy.frombuffer can use them without copying.
+    ranks holds the rank of every node, the ids are ordered by rank.
+
+    A built lattice can be written to a file by save and opened again by load, which maps the file
+    into memory and creates the nodes only when they are accessed.
+
+    With build=False the nodes and edges are not stored, get_f_polynomial, get_depth 
+    and get_nodes_in_layer then run on the stream of layers.
+    With workers > 1 the successors of large layers are computed in a pool of that many processes,
+    the resulting lattice is the same.
     """
-    def __init__(self, diagram, fixed_segment):
+    def __init__(self, diagram, fixed_segment, build=True, workers=None):
         self.diagram = diagram
         self.fixed_segment = fixed_segment
         self.nodes = []
+        self.ranks = array("H")
         self.state_count = 0
-        self.edges = []
-        self._build_lattice()
+        self.built = build
+        self._minimal_state = None
+        # exponent vector -> coefficient of the f-polynomial, accumulated while building
+        self._f_terms = {}
+        # marker positions (bytes) -> node id, used to deduplicate states in O(1)
+        self._node_index = {}
+        # cover relations in CSR form
+        self.up_offsets = array("I", [0])
+        self.up_targets = array("I")
+        self.up_labels = array("H")
+        self.down_offsets = array("I", [0])
+        self.down_targets = array("I")
+        self.down_labels = array("H")
+        self._transposed_segments = None
+        if build:
+            self._build_lattice(workers)
+
+    @property
+    def transposed_segments(self):
+        """
+        Sorted list of the segments at which transpositions occur in the lattice.
+        """
+        if self._transposed_segments is None:
+            self._transposed_segments = sorted(set(self.get_sequence_min_to_max()))
+        return self._transposed_segments
 
     def _create_node(self, state, previous_node_transpositions, transposition):
         """
@@ -33,68 +189,309 @@ class StateLattice:
             node = StateNode(state, previous_node_transpositions +","+ str(transposition))
         return node
 
-    def _build_lattice(self):
+    @staticmethod
+    def _add_transposition(exponents, transposition):
+        """
+        Exponent vector of a successor: the exponent vector of the node plus the unit vector of the segment.
+        """
+        exponents = list(exponents)
+        exponents[transposition-1] += 1
+        return tuple(exponents)
+
+    def _build_lattice(self, workers=None):
         """
         Build the state lattice for the given knot diagram.
+        Nodes are indexed by the marker positions of their Kauffman state, so every state is visited once 
+        and looking up an already known state is a dictionary access on the bytes,
+        a KauffmanState is only created for a new node.
+        The lattice is built layer by layer, a counterclockwise transposition raises the rank by one,
+        so the successors of a layer form the next layer. The nodes of a layer are expanded in the order
+        of their ids, so the successors are appended to the CSR arrays node by node.
+        The predecessors are sorted by a counting sort at the end.
+        The f-polynomial is accumulated on the way, the exponent vectors are only kept for the current layer.
         """
         minimal_state = self.get_minimal_state()
         min_name = ""
-        node = StateNode(minimal_state,min_name)
-        queue = [node]
-        self.nodes.append(node)
-
-        while queue:
-            node = queue.pop(0)
-            possible_transpositions = node.state.get_all_possible_transpositions("ccw")
-            for transposition in possible_transpositions:
-                next_state = node.state.transpose(transposition,"ccw")
-                new_node = self._create_node(next_state, node.transpositions.string, transposition)
-                if new_node not in queue:
-                    queue.append(new_node)
-                    self.nodes.append(new_node)
-                    self.edges.append((node, new_node, transposition))
-                else:
-                    self.edges.append((node, new_node, transposition))
+        self.nodes.append(StateNode(minimal_state,min_name))
+        self.ranks.append(0)
+        self._node_index[minimal_state.markers] = 0
+        layer_exponents = [(0,)*self.diagram.number_of_segments]
+        self._f_terms = {layer_exponents[0]: 1}
+        layer_start, rank = 0, 0
+
+        executor = None
+        if workers is not None and workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.diagram.pd_notation,))
+        try:
+            while layer_start < len(self.nodes):
+                layer_stop = len(self.nodes)
+                next_layer_exponents = []
+                expanded = self._expand_layer(layer_start, layer_stop, executor, workers)
+                for node_id, (successors, ccw_segments) in zip(range(layer_start, layer_stop), expanded):
+                    node = self.nodes[node_id]
+                    for transposition, next_markers, next_state in successors:
+                        next_id = self._node_index.get(next_markers)
+                        if next_id is None:
+                            next_id = len(self.nodes)
+                            if next_state is None:
+                                # continue the incremental tracking of the transposable segments of the node
+                                transposable = (None, ccw_segments, self.diagram.transposition_masks[transposition])
+                                next_state = KauffmanState._from_markers(self.diagram, next_markers, transposable)
+                            self.nodes.append(self._create_node(next_state, node.transpositions.string, transposition))
+                            self._node_index[next_markers] = next_id
+                            self.ranks.append(rank + 1)
+                            next_exponents = self._add_transposition(layer_exponents[node_id - layer_start], transposition)
+                            next_layer_exponents.append(next_exponents)
+                            self._f_terms[next_exponents] = self._f_terms.get(next_exponents, 0) + 1
+                        self.up_targets.append(next_id)
+                        self.up_labels.append(transposition)
+                    self.up_offsets.append(len(self.up_targets))
+                layer_start, layer_exponents, rank = layer_stop, next_layer_exponents, rank + 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self._build_down_edges()
         max_state = self.nodes[-1]
-        self.transposed_segments = max_state.get__transposed_segments()
+        self._transposed_segments = sorted(max_state.get__transposed_segments()) if max_state.get_length() else []
+
+    def _expand_layer(self, layer_start, layer_stop, executor=None, workers=1):
+        """
+        Yield for every node of the layer the list of (transposed segment, successor marker positions, successor state)
+        and the bitset of the ccw transposable segments of the node.
+        With an executor the marker positions of the layer and the bitsets of transposable segments of the states
+        are packed into 4 chunks per worker and the successors are computed by _expand_packed_states
+        in the worker processes, only their marker positions are returned and the successor state is None.
+        The bitsets of a node are dropped once it is expanded, they are not needed afterwards.
+        """
+        if executor is None or layer_stop - layer_start < PARALLEL_MIN_LAYER_SIZE:
+            for node_id in range(layer_start, layer_stop):
+                state = self.nodes[node_id].state
+                node_successors = []
+                for transposition in state.get_all_possible_transpositions("ccw"):
+                    next_state = state.transpose(transposition,"ccw")
+                    node_successors.append((transposition, next_state.markers, next_state))
+                ccw_segments = state.get_transposable_segments("ccw")
+                state.clear_transposable_segments()
+                yield node_successors, ccw_segments
+            return
+        number_of_crossings = self.diagram.number_of_crossings
+        chunk_size = -(-(layer_stop - layer_start) // (4*workers))
+        chunks = []
+        for start in range(layer_start, layer_stop, chunk_size):
+            states = [self.nodes[node_id].state for node_id in range(start, min(start + chunk_size, layer_stop))]
+            chunks.append((b"".join(state.markers for state in states), [state.get_transposable_state() for state in states]))
+            for state in states:
+                state.clear_transposable_segments()
+        for counts, labels, successors, ccw_segments in executor.map(_expand_packed_states, chunks):
+            position = 0
+            for count, node_ccw_segments in zip(counts, ccw_segments):
+                yield ([(labels[i], successors[i*number_of_crossings:(i+1)*number_of_crossings], None)
+                        for i in range(position, position + count)], node_ccw_segments)
+                position += count
+
+    def _build_down_edges(self):
+        """
+        Predecessor CSR arrays from the successor CSR arrays.
+        """
+        counts = array("I", [0])*len(self.nodes)
+        for target in self.up_targets:
+            counts[target] += 1
+        self.down_offsets = array("I", [0])
+        for count in counts:
+            self.down_offsets.append(self.down_offsets[-1] + count)
+        self.down_targets = array("I", [0])*len(self.up_targets)
+        self.down_labels = array("H", [0])*len(self.up_targets)
+        positions = self.down_offsets[:-1]
+        for source in range(len(self.nodes)):
+            for i in range(self.up_offsets[source], self.up_offsets[source+1]):
+                target = self.up_targets[i]
+                self.down_targets[positions[target]] = source
+                self.down_labels[positions[target]] = self.up_labels[i]
+                positions[target] += 1
+
+    @property
+    def edges(self):
+        """
+        List of the cover relations (node, successor, transposed segment), created from the CSR arrays.
+        """
+        edges = []
+        for source in range(len(self.up_offsets) - 1):
+            for i in range(self.up_offsets[source], self.up_offsets[source+1]):
+                edges.append((self.nodes[source], self.nodes[self.up_targets[i]], self.up_labels[i]))
+        return edges
+
+    def get_successors(self, node_id):
+        """
+        List of (node id, transposed segment) of the nodes covering the node.
+        """
+        start, stop = self.up_offsets[node_id], self.up_offsets[node_id+1]
+        return list(zip(self.up_targets[start:stop], self.up_labels[start:stop]))
+
+    def get_predecessors(self, node_id):
+        """
+        List of (node id, transposed segment) of the nodes covered by the node.
+        """
+        start, stop = self.down_offsets[node_id], self.down_offsets[node_id+1]
+        return list(zip(self.down_targets[start:stop], self.down_labels[start:stop]))
+
+    def _get_node_index(self):
+        """
+        Marker positions -> node id, for a loaded lattice created from the marker array on first use.
+        """
+        if self._node_index is None:
+            number_of_crossings = self.diagram.number_of_crossings
+            markers = self.nodes.markers
+            self._node_index = {bytes(markers[i*number_of_crossings:(i+1)*number_of_crossings]): i for i in range(len(self.nodes))}
+        return self._node_index
+
+    def get_node_id(self, node):
+        """
+        Id of a node of the lattice, None if its state is not in the lattice.
+        """
+        node_id = self._get_node_index().get(node.state.markers)
+        if node_id is None or self.nodes[node_id].state != node.state:
+            return None
+        return node_id
+
+    def get_node_by_state(self, state):
+        """
+        Get the node of a Kauffman state, None if the state is not in the lattice.
+        """
+        node_id = self._get_node_index().get(state.markers)
+        if node_id is None or self.nodes[node_id].state != state:
+            return None
+        return self.nodes[node_id]
 
-    
     def get_node_by_transpositions(self, transpositions_string):
         """
         Get a node by its name.
+        Counterclockwise transpositions commute, so the state is obtained by applying 
+        the transpositions to the minimal state in any order and then looked up.
         """
-        for node in self.nodes:
-            if node.transpositions == TranspositionSequence(transpositions_string):
-                return node
-        return None
+        transpositions = TranspositionSequence(transpositions_string)
+        state = self.get_minimal_state()
+        if transpositions.get_length() > 0:
+            for transposition in transpositions.string.split(","):
+                try:
+                    state = state.transpose(int(transposition),"ccw")
+                except ValueError:
+                    return None
+        node = self.get_node_by_state(state)
+        if node is None or node.transpositions != transpositions:
+            return None
+        return node
+
+    def iter_layers(self):
+        """
+        Yield the layers of the lattice as lists of nodes, starting with the layer of the minimal state.
+        A counterclockwise transposition raises the rank by one, so all successors of a layer
+        lie in the next layer and only the current layer has to be kept in memory.
+        """
+        if self.built:
+            for rank in range(self.get_depth() + 1):
+                yield self.get_nodes_in_layer(rank)
+            return
+        for layer in self._iter_layers_with_exponents():
+            yield [node for node, exponents in layer]
+
+    def _iter_layers_with_exponents(self):
+        """
+        Yield the layers of the lattice as lists of pairs of a node and its exponent vector.
+        """
+        layer = [(StateNode(self.get_minimal_state(), ""), (0,)*self.diagram.number_of_segments)]
+        while layer:
+            yield layer
+            next_layer = {}
+            for node, exponents in layer:
+                for transposition in node.state.get_all_possible_transpositions("ccw"):
+                    next_state = node.state.transpose(transposition,"ccw")
+                    if next_state not in next_layer:
+                        next_node = self._create_node(next_state, node.transpositions.string, transposition)
+                        next_layer[next_state] = (next_node, self._add_transposition(exponents, transposition))
+            layer = list(next_layer.values())
+
+    def iter_states(self, order="bfs"):
+        """
+        Stream the nodes of the lattice starting at the minimal state.
+        order="bfs": yields the nodes one by one in breadth first order.
+        order="rank": yields a list of nodes for each rank.
+        """
+        if order == "rank":
+            yield from self.iter_layers()
+        elif order == "bfs":
+            for layer in self.iter_layers():
+                yield from layer
+        else:
+            raise ValueError("Invalid order: must be 'bfs' or 'rank'.")
 
     def get_depth(self):
         """
-        Depth of the lattice, lattice build method has to be called first
+        Depth of the lattice
         """
-        return self.nodes[-1].get_length()
+        if self.built:
+            return self.ranks[-1]
+        depth = -1
+        for layer in self.iter_layers():
+            depth += 1
+        return depth
 
     def get_nodes_in_layer(self, layer_number):
         """
         Get all nodes in a specific layer of the lattice, i.e. states which are *layer_number* times transposed starting from the minimal state.
         """
-        return [node for node in self.nodes if node.get_length() == layer_number]
+        if self.built:
+            start, stop = self._get_layer_range(layer_number)
+            return self.nodes[start:stop]
+        for rank, layer in enumerate(self.iter_layers()):
+            if rank == layer_number:
+                return layer
+        return []
+
+    def _get_layer_range(self, layer_number):
+        """
+        Range of the ids of the nodes in a layer of a built lattice.
+        """
+        return bisect_left(self.ranks, layer_number), bisect_left(self.ranks, layer_number + 1)
+
+    def get_rank_sizes(self):
+        """
+        Number of states in each layer of the lattice.
+        If the lattice is not built, the states are counted by get_rank_sizes of src.statecount
+        without enumerating them.
+        """
+        if self.built:
+            sizes = []
+            for rank in range(self.get_depth() + 1):
+                start, stop = self._get_layer_range(rank)
+                sizes.append(stop - start)
+            return sizes
+        return get_rank_sizes(self.diagram, self.fixed_segment)
+
+    def get_number_of_states(self):
+        """
+        Number of states in the lattice.
+        """
+        if self.built:
+            return len(self.nodes)
+        return sum(self.get_rank_sizes())
 
     def get_minimal_state(self):
         """
         Get the minimal state in the lattice.
         If the lattice is already built, return the first node's state which is the minimal state.
         Otherwise, computes the minimal state by transposing clockwise until no more transpositions are possible 
-        from a random starting state.
+        from a starting state found by a matching of crossings and regions.
 
         Returns the state as a KauffmanState object.
         """
         # If the lattice is already built, return the first node's state.
         if len(self.nodes) > 0:
             return self.nodes[0].state
+        if self._minimal_state is not None:
+            return self._minimal_state
 
         # Otherwise, compute the minimal state by transposing clockwise.
-        state = self.diagram.get_kstate_greedy_randomized(self.fixed_segment,1000)
+        state = self.diagram.get_kstate_matching(self.fixed_segment)
         made_transposition = True
         while made_transposition:
             made_transposition = False
@@ -102,13 +499,14 @@ class StateLattice:
                 if state.is_transposable(segment, "cw"):
                     state = state.transpose(segment,"cw")
                     made_transposition = True
+        self._minimal_state = state
         return state
     
     def get_maximal_state(self):
         """
         Get the maximal state in the lattice.
         """
-        state = self.diagram.get_kstate_greedy_randomized(self.fixed_segment,1000)
+        state = self.diagram.get_kstate_matching(self.fixed_segment)
         made_transposition = True
         while made_transposition:
             made_transposition = False
@@ -134,10 +532,100 @@ class StateLattice:
                     made_transposition = True
         return sequence_of_transpositions
 
+    def _get_f_terms_from_edges(self):
+        """
+        Terms of the f-polynomial of a loaded lattice. The exponent vector of a node is the one of its
+        first predecessor plus the unit vector of the transposed segment, so only the exponent vectors
+        of the previous layer are kept.
+        """
+        previous_layer = {}
+        layer = {0: (0,)*self.diagram.number_of_segments}
+        terms = {layer[0]: 1}
+        for node_id in range(1, len(self.ranks)):
+            if self.ranks[node_id] != self.ranks[node_id-1]:
+                previous_layer, layer = layer, {}
+            first = self.down_offsets[node_id]
+            exponents = self._add_transposition(previous_layer[self.down_targets[first]], self.down_labels[first])
+            layer[node_id] = exponents
+            terms[exponents] = terms.get(exponents, 0) + 1
+        return terms
+
+    def save(self, path):
+        """
+        Write the built lattice to a binary file: a header, the PD notation, the marker positions of every node
+        (one byte per crossing), the ranks and the CSR arrays of the cover relations,
+        all as little endian integers, each array starting at a multiple of 4 bytes.
+        """
+        if not self.built:
+            raise ValueError("Only a built lattice can be saved.")
+        markers = bytearray()
+        for node_id in range(len(self.nodes)):
+            markers += self.nodes[node_id].state.markers
+        parts = [
+            HEADER.pack(MAGIC, self.fixed_segment, self.diagram.number_of_crossings, len(self.nodes), len(self.up_targets)),
+            _to_little_endian(array("H", [segment for crossing in self.diagram.pd_notation for segment in crossing])),
+            bytes(markers),
+        ]
+        for values in (self.ranks, self.up_offsets, self.up_targets, self.up_labels,
+                       self.down_offsets, self.down_targets, self.down_labels):
+            parts.append(_to_little_endian(array(values.typecode, values)))
+        with open(path, "wb") as f:
+            position = 0
+            for part in parts:
+                f.write(bytes(_align(position) - position))
+                position = _align(position)
+                f.write(part)
+                position += len(part)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Open a lattice written by save. With mmap=True the file is memory mapped and the arrays
+        are views of the mapped file, otherwise the file is read into memory.
+        The nodes are created when they are accessed, the index of the states on the first lookup of a state.
+        """
+        from src.knotdiagram import KnotDiagram
+        with open(path, "rb") as f:
+            if mmap:
+                buffer = mmap_module.mmap(f.fileno(), 0, access=mmap_module.ACCESS_READ)
+            else:
+                buffer = f.read()
+        magic, fixed_segment, number_of_crossings, number_of_nodes, number_of_edges = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a lattice file")
+        labels, position = _read_array(buffer, HEADER.size, "H", 4*number_of_crossings)
+        pd_notation = [tuple(labels[i:i+4]) for i in range(0, len(labels), 4)]
+        lattice = cls(KnotDiagram(pd_notation), fixed_segment, build=False)
+        lattice.built = True
+        lattice._f_terms = None
+        lattice._node_index = None
+        position = _align(position)
+        markers = memoryview(buffer)[position:position + number_of_nodes*number_of_crossings]
+        position += len(markers)
+        for name, typecode, length in (("ranks", "H", number_of_nodes), ("up_offsets", "I", number_of_nodes + 1),
+                                       ("up_targets", "I", number_of_edges), ("up_labels", "H", number_of_edges),
+                                       ("down_offsets", "I", number_of_nodes + 1), ("down_targets", "I", number_of_edges),
+                                       ("down_labels", "H", number_of_edges)):
+            values, position = _read_array(buffer, _align(position), typecode, length)
+            setattr(lattice, name, values)
+        lattice.nodes = _MappedNodes(lattice, markers)
+        return lattice
+
     def get_f_polynomial(self):
-        polynomial = []
-        for node in self.nodes:
-            term =[0] + [0]*self.diagram.number_of_segments
-            polynomial.append(node.transpositions.get_transposition_count(term))
+        """
+        Get the f-polynomial of the lattice, the monomials of equal states are combined.
+        Every state has its own exponent vector, so if the lattice is not built all states are streamed,
+        unlike get_rank_sizes the f-polynomial can not be counted without enumerating the states.
+        """
+        if self.built:
+            if self._f_terms is None:
+                self._f_terms = self._get_f_terms_from_edges()
+            terms = self._f_terms
+        else:
+            terms = {}
+            for layer in self._iter_layers_with_exponents():
+                for node, exponents in layer:
+                    terms[exponents] = terms.get(exponents, 0) + 1
+        polynomial = [[coefficient, *exponents] for exponents, coefficient in terms.items()]
         return src.polynom.MultivariatePolynom(polynomial)
     
\ No newline at end of file
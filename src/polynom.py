@@ -1,5 +1,4 @@
-from itertools import product
-from operator import itemgetter
+from fractions import Fraction
 
 def simplify_laurent_polynom(polynom):
     simplified_polynom = []
@@ -12,17 +11,59 @@ def simplify_laurent_polynom(polynom):
             simplified_polynom.append(summand)
     return simplified_polynom
 
-def specialize_monom(monom,specialization):
+def get_monomial(laurent):
     """
-    input monom is a list:
-    [coefficient,var_a_power,var_b_power, ...]
-    specialization is list of length number of variables of the monom (i.e. len(monom)-1)
-    containing laurent polynoms
+    Returns (coefficient, power) if the laurent polynom is a monomial c*t^k, (0,0) for the zero polynom
+    and None if it has more than one term.
     """
-    specialized_laurent = LaurentPolynom([[monom[0],0]])
-    for i in range(len(specialization)):
-        specialized_laurent = specialized_laurent*(specialization[i]**monom[i+1])
-    return specialized_laurent
+    if len(laurent.terms) > 1:
+        return None
+    for power, coefficient in laurent.terms.items():
+        return (coefficient, power)
+    return (0, 0)
+
+def coefficient_power(coefficient, exponent):
+    if exponent >= 0:
+        return coefficient**exponent
+    if coefficient == 0:
+        raise ValueError("Laurent polynom inverse does not exist")
+    result = Fraction(coefficient)**exponent
+    return result.numerator if result.denominator == 1 else result
+
+def specialize_rows(rows, specialization):
+    """
+    Specialize a polynom given by sparse exponent rows [(coefficient, ((variable index, exponent),...)),...],
+    with only the nonzero exponents listed, to a laurent polynom.
+    specialization is a LaurentPolynom object for each variable.
+
+    If every variable is mapped to a monomial c*t^k, a row gives the single term
+    coefficient*prod(c^e) t^(sum k*e) and the terms are collected by power.
+    Otherwise the powers of the specialized variables are computed once and reused for all rows.
+    Returns dict power -> coefficient
+    """
+    monomials = [get_monomial(variable) for variable in specialization]
+    result = {}
+    if all(monomial is not None for monomial in monomials):
+        for coefficient, exponents in rows:
+            power = 0
+            for variable, exponent in exponents:
+                variable_coefficient, variable_power = monomials[variable]
+                coefficient *= coefficient_power(variable_coefficient, exponent)
+                power += variable_power*exponent
+            if coefficient != 0:
+                result[power] = result.get(power, 0) + coefficient
+        return result
+
+    powers = [{} for variable in specialization]
+    for coefficient, exponents in rows:
+        term = LaurentPolynom._from_terms({0: coefficient})
+        for variable, exponent in exponents:
+            if exponent not in powers[variable]:
+                powers[variable][exponent] = specialization[variable]**exponent
+            term = term*powers[variable][exponent]
+        for power, term_coefficient in term.terms.items():
+            result[power] = result.get(power, 0) + term_coefficient
+    return result
 
 class Polynom:
     def __init__(self,polynom):
@@ -57,6 +98,8 @@ class MultivariatePolynom(Polynom):
         for summand in polynomial:
             term_latex_string = ""
             if any([entry!=0 for entry in summand[1:]]):
+                if summand[0] != 1:
+                    term_latex_string += str(summand[0])
                 for i, count in enumerate(summand[1:]):
                     if count > 1:
                         term_latex_string += f"y_{{{i+1}}}^{count}"
@@ -76,6 +119,13 @@ class MultivariatePolynom(Polynom):
         return result
             
 
+    def get_exponent_rows(self):
+        """
+        Returns the monomials as sparse rows [(coefficient, ((variable index, exponent),...)),...]
+        with only the nonzero exponents.
+        """
+        return [(monom[0], tuple((i, exponent) for i, exponent in enumerate(monom[1:]) if exponent != 0)) for monom in self.polynom]
+
     def specialize_to_laurent(self,specialization):
         """
         polynom is a list of monomials
@@ -87,48 +137,83 @@ class MultivariatePolynom(Polynom):
         specialization is a LaurentPolynom object for each variable of the multivariable polynom
         i.e.: [LaurentPolynom([[...]]),...]
         """
-        laurent = LaurentPolynom([[0,0]])
-        for monom in self.polynom:
-            specialized_mon = specialize_monom(monom,specialization)
-            laurent = laurent + specialized_mon
-        laurent.simplify()
-        return laurent
+        return LaurentPolynom._from_terms(specialize_rows(self.get_exponent_rows(), specialization))
 
-def multiply_laurent_monom(term):
+def normalize_power(power):
     """
-    expected input term = [[coefficient_a,power_a], [coefficient_b,power_b]]
-    returns [coefficient_a*coefficient_b,power_a+power_b]"""
-    result = [term[0][0]*term[1][0],term[0][1]+term[1][1]]
-    return result
+    Exact powers which are integers are stored as int, e.g. Fraction(4,4) -> 1
+    """
+    if isinstance(power, Fraction) and power.denominator == 1:
+        return power.numerator
+    return power
+
+def power_to_latex(power):
+    if power == int(power):
+        return str(int(power))
+    return str(power)
 
 class LaurentPolynom(Polynom):
+    """
+    Laurent polynom in one variable t, the powers are integers or fractions.Fraction.
+    The terms are stored as a dict mapping power to coefficient without zero coefficients,
+    so the representation is always simplified and equality and hashing only compare the dicts.
+    """
     def __init__(self,polynom):
         """
         polynom is a list in the following format: [[coefficient,power],...]
         """
         self.polynom = polynom
 
+    @classmethod
+    def _from_terms(cls, terms):
+        """
+        Create a laurent polynom from a dict power -> coefficient, zero coefficients are removed.
+        """
+        laurent = cls.__new__(cls)
+        laurent.terms = {normalize_power(power): coefficient for power, coefficient in terms.items() if coefficient != 0}
+        laurent._hash = None
+        return laurent
+
+    @property
+    def polynom(self):
+        """
+        List of the terms [[coefficient,power],...] sorted by power, [[0,0]] for the zero polynom.
+        """
+        if not self.terms:
+            return [[0,0]]
+        return [[self.terms[power], power] for power in sorted(self.terms)]
+
+    @polynom.setter
+    def polynom(self, polynom):
+        terms = {}
+        for coefficient, power in polynom:
+            terms[power] = terms.get(power, 0) + coefficient
+        self.terms = {normalize_power(power): coefficient for power, coefficient in terms.items() if coefficient != 0}
+        self._hash = None
+
     def __eq__(self, value):
-        self.simplify()
-        value.simplify()
-        if all([monom in value.polynom for monom in self.polynom]) and all([monom in self.polynom for monom in value.polynom]):
-            return True
-        return False
+        if not isinstance(value, LaurentPolynom):
+            return False
+        return self.terms == value.terms
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self.terms.items()))
+        return self._hash
+
+    def _shifted_terms(self):
+        """
+        Terms multiplied by the power of t which makes the lowest power 0.
+        """
+        if not self.terms:
+            return {}
+        lowest_power = min(self.terms)
+        return {power - lowest_power: coefficient for power, coefficient in self.terms.items()}
 
     def equal_up_to_factor(self,value):
         if not isinstance(value,LaurentPolynom):
             return False
-        a = LaurentPolynom(self.polynom)
-        b = LaurentPolynom(value.polynom)
-        a.simplify()
-        b.simplify()
-        a.transform_into_polynom()
-        b.transform_into_polynom()
-        if a==b:
-            return True
-        return False
-
-            
+        return self._shifted_terms() == value._shifted_terms()
 
     def to_latex(self):
         """
@@ -150,27 +235,17 @@ class LaurentPolynom(Polynom):
                 if term[1] == 1:
                     polynom_latex += f" {sign} {coefficient}t"
                 else:
-                    polynom_latex += f" {sign} {coefficient}t^{{{int(term[1])}}}"
+                    polynom_latex += f" {sign} {coefficient}t^{{{power_to_latex(term[1])}}}"
         polynom_latex = polynom_latex.strip()
         if polynom_latex.startswith("+"):
             polynom_latex = polynom_latex[1:].strip()
         return polynom_latex
 
     def simplify(self):
-        simplified_polynom = []
-        for summand in self.polynom:
-            if any(term[1] == summand[1] for term in simplified_polynom):
-                for term in simplified_polynom:
-                    if term[1] == summand[1]:
-                        term[0] += summand[0]
-            else:
-                simplified_polynom.append(summand)
-        for term in simplified_polynom:
-            if term[0]==0:
-                simplified_polynom.remove(term)
-        if simplified_polynom == []:
-            simplified_polynom = [[0,0]]
-        self.polynom = simplified_polynom
+        """
+        The terms are always combined, kept for compatibility.
+        """
+        pass
 
     def get_specialization(self,specialization):
         """
@@ -179,70 +254,63 @@ class LaurentPolynom(Polynom):
 
         returns specialized laurent polynom
         """
-        specialization = [specialization]
-        result = LaurentPolynom([[0,0]])
-        for monom in self.polynom:
-            result = result + specialize_monom(monom,specialization)
-        return result
+        rows = [(coefficient, ((0, power),) if power != 0 else ()) for power, coefficient in self.terms.items()]
+        return LaurentPolynom._from_terms(specialize_rows(rows, [specialization]))
 
     def sort(self):
-        self.polynom = sorted(self.polynom,key=itemgetter(1))
+        """
+        The terms are always returned sorted by power, kept for compatibility.
+        """
+        pass
 
     def transform_into_polynom(self):
-        lowest_power = self.polynom[0][1]
-        for summand in self.polynom:
-            if summand[1]<lowest_power:
-                lowest_power = summand[1]
-        if lowest_power==0:
-            return
-        x = LaurentPolynom([[1,-lowest_power]])
-        transformed = x *self
-        self.polynom = transformed.polynom
+        """
+        Multiply with a power of t such that the lowest power is 0.
+        """
+        self.terms = self._shifted_terms()
+        self._hash = None
 
     def print_normalized_to_latex(self):
-        laurent = LaurentPolynom(self.polynom)
-        laurent.simplify()
-        laurent.transform_into_polynom()
+        laurent = LaurentPolynom._from_terms(self._shifted_terms())
         print(laurent.to_latex())
         
 
     def __add__(self,other):
-        polynom = self.polynom.copy()
-        for term in other.polynom:
-            polynom.append(term)
-        sum = LaurentPolynom(polynom)
-        sum.simplify()
-        return sum
+        terms = self.terms.copy()
+        for power, coefficient in other.terms.items():
+            terms[power] = terms.get(power, 0) + coefficient
+        return LaurentPolynom._from_terms(terms)
 
     def __mul__(self,other):
         if not isinstance(other,LaurentPolynom):
             raise NotImplementedError("Only multiply laurent with other laurent polynoms")
-        self.simplify()
-        other.simplify()
-        polynom_a = self.polynom
-        polynom_b = other.polynom
-        result = []
-        for term in product(polynom_a,polynom_b):
-            summand = multiply_laurent_monom(term)
-            result.append(summand)
-        return LaurentPolynom(result)
+        terms = {}
+        for power_a, coefficient_a in self.terms.items():
+            for power_b, coefficient_b in other.terms.items():
+                power = power_a + power_b
+                terms[power] = terms.get(power, 0) + coefficient_a*coefficient_b
+        return LaurentPolynom._from_terms(terms)
 
     def __pow__(self,power):
-        self.simplify()
         if power<0:
-            if len(self.polynom)>1:
+            if len(self.terms)!=1:
                 raise ValueError("Laurent polynom inverse does not exist")
             else:
-                monom = self.polynom[0].copy()
-                monom[1]=monom[1]*power
-                return LaurentPolynom([monom])
-        elif power==0:
-            return LaurentPolynom([[1,0]])
-        else:
-            result = LaurentPolynom([[1,0]])
-            for i in range(power):
-                result = self*result
-            return result
+                (monom_power, coefficient), = self.terms.items()
+                coefficient = Fraction(coefficient)**power
+                if coefficient.denominator == 1:
+                    coefficient = int(coefficient)
+                return LaurentPolynom([[coefficient,monom_power*power]])
+        # exponentiation by squaring
+        result = LaurentPolynom([[1,0]])
+        base = self
+        while power > 0:
+            if power % 2 == 1:
+                result = result*base
+            power //= 2
+            if power > 0:
+                base = base*base
+        return result
                 
         
         
@@ -0,0 +1,107 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+ROLFSEN_JSON_PATH = "rolfsen_pd_dict.json"
+ROLFSEN_TABLE_PATH = "rolfsen_pd.bin"
+
+MAGIC = b"KPD1"
+# magic, width of a segment label in bytes, number of knots
+HEADER = struct.Struct("<4sBI")
+# offset of the first label of the knot in the data (in labels), number of crossings
+INDEX_ENTRY = struct.Struct("<IH")
+LABEL_FORMATS = {1: "B", 2: "H"}
+
+def build_rolfsen_table(json_path=ROLFSEN_JSON_PATH, table_path=ROLFSEN_TABLE_PATH):
+    """
+    Pack the PD notations of the Rolfsen table into a binary file:
+    a header, an index with the name, offset and number of crossings of every knot
+    and the segment labels of all knots as one array of 1 byte (2 bytes if a label exceeds 255) integers.
+    """
+    with open(json_path) as f:
+        rolfsen_pd_dict = json.load(f)
+    largest_label = max((segment for pd_notation in rolfsen_pd_dict.values() for crossing in pd_notation for segment in crossing), default=0)
+    width = 1 if largest_label < 256 else 2
+    index = bytearray()
+    labels = []
+    for name, pd_notation in rolfsen_pd_dict.items():
+        encoded_name = name.encode()
+        index += struct.pack("<B", len(encoded_name)) + encoded_name
+        index += INDEX_ENTRY.pack(len(labels), len(pd_notation))
+        for crossing in pd_notation:
+            labels.extend(crossing)
+    with open(table_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, width, len(rolfsen_pd_dict)))
+        f.write(index)
+        f.write(struct.pack(f"<{len(labels)}{LABEL_FORMATS[width]}", *labels))
+
+class RolfsenTable:
+    """
+    Read access to a table written by build_rolfsen_table.
+    The file is memory mapped and only the index is read on opening,
+    the PD notation of a knot is decoded when it is requested.
+
+    table["3_1"] returns the PD notation as list of 4-tuples.
+    """
+    def __init__(self, path=ROLFSEN_TABLE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._width, number_of_knots = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Rolfsen table")
+        self._label_format = LABEL_FORMATS[self._width]
+        # name -> (offset, number of crossings)
+        self._index = {}
+        position = HEADER.size
+        for i in range(number_of_knots):
+            name_length = self._data[position]
+            name = self._data[position+1:position+1+name_length].decode()
+            position += 1 + name_length
+            self._index[name] = INDEX_ENTRY.unpack_from(self._data, position)
+            position += INDEX_ENTRY.size
+        self._labels_start = position
+
+    def __getitem__(self, name):
+        offset, number_of_crossings = self._index[name]
+        labels = struct.unpack_from(f"<{4*number_of_crossings}{self._label_format}", self._data, self._labels_start + offset*self._width)
+        return [labels[i:i+4] for i in range(0, len(labels), 4)]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def get_number_of_crossings(self, name):
+        return self._index[name][1]
+
+    def items(self):
+        for name in self._index:
+            yield name, self[name]
+
+    def close(self):
+        self._data.close()
+
+_rolfsen_table = None
+
+def get_rolfsen_table(table_path=ROLFSEN_TABLE_PATH, json_path=ROLFSEN_JSON_PATH):
+    """
+    The Rolfsen table of the process, opened on first use.
+    The table is built from the json file if it does not exist or is older than the json file.
+    """
+    global _rolfsen_table
+    if _rolfsen_table is None:
+        if not os.path.exists(table_path) or (os.path.exists(json_path) and os.path.getmtime(json_path) > os.path.getmtime(table_path)):
+            build_rolfsen_table(json_path, table_path)
+        _rolfsen_table = RolfsenTable(table_path)
+    return _rolfsen_table
+
+if __name__ == "__main__":
+    # python -m src.rolfsen [json path] [table path]
+    build_rolfsen_table(*sys.argv[1:3])
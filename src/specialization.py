@@ -0,0 +1,356 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.polynom import LaurentPolynom
+
+def get_normalized_key(terms):
+    """
+    Hashable key of a laurent polynom given as dict power -> coefficient,
+    which is equal for two polynoms if and only if they are equal up to a power of t.
+    """
+    if not terms:
+        return ()
+    lowest_power = min(terms)
+    return tuple(sorted((power - lowest_power, coefficient) for power, coefficient in terms.items() if coefficient != 0))
+
+class SpecializationSearch:
+    """
+    Search for specializations of the f-polynomial of a state lattice which give a target
+    laurent polynom (e.g. the Jones polynom) up to a power of t.
+
+    Every transposed segment is specialized to a monomial c*t^k with c and k from values,
+    the other segments do not occur in the f-polynomial. If c is zero the power k is irrelevant,
+    so only canonical candidates are enumerated: one candidate with k=0 for c=0.
+    The candidates are numbered: the coefficients (c_1,...,c_m) are the leading digits and the
+    powers of the variables with nonzero coefficient the trailing digits of the index,
+    so consecutive candidates share their coefficients. For a block of candidates with the same
+    coefficients the coefficients of the terms are computed once and the powers of the terms are
+    updated incrementally.
+
+    With prune=True blocks and candidates are rejected by invariants of the target up to a power of t:
+    the value at t=1, which only depends on the coefficients, and the absolute value at t=-1,
+    which only depends on the parities of the powers.
+    """
+    def __init__(self, lattice, target, values=(-2,-1,0,1,2), prune=True):
+        self.number_of_segments = lattice.diagram.number_of_segments
+        self.variables = list(lattice.transposed_segments)
+        self.values = list(values)
+        self.number_of_values = len(self.values)
+        self.prune = prune
+        # number of candidates for a variable with the coefficient values[digit]
+        self._digit_weights = [self.number_of_values if value != 0 else 1 for value in self.values]
+        self._variable_weight = sum(self._digit_weights)
+        self.number_of_candidates = self._variable_weight**len(self.variables)
+
+        variable_index = {segment: i for i, segment in enumerate(self.variables)}
+        self.rows = []
+        for coefficient, exponents in lattice.get_f_polynomial().get_exponent_rows():
+            self.rows.append((coefficient, tuple((variable_index[segment_index+1], exponent) for segment_index, exponent in exponents)))
+
+        if isinstance(target, LaurentPolynom):
+            target = target.terms
+        self.target_key = get_normalized_key(target)
+        self.target_span = self.target_key[-1][0] if self.target_key else 0
+        self.target_trailing = self.target_key[0][1] if self.target_key else 0
+        self.target_leading = self.target_key[-1][1] if self.target_key else 0
+        self.target_value_at_one = sum(coefficient for power, coefficient in self.target_key)
+        # the specializations have integer powers, so t=-1 is only used for a target with integer powers
+        self.target_value_at_minus_one = None
+        if all(power == int(power) for power, coefficient in self.target_key):
+            self.target_value_at_minus_one = abs(sum(coefficient*(-1)**int(power) for power, coefficient in self.target_key))
+
+    def get_fingerprint(self):
+        """
+        Hash of the search space, used to check that a checkpoint belongs to the same search.
+        """
+        data = repr((self.number_of_segments, self.variables, self.values, self.rows, self.target_key))
+        return hashlib.md5(data.encode()).hexdigest()
+
+    def _decode_index(self, index):
+        """
+        Returns the digits of the coefficients, the number of the powers in the block and the size of the block of an index.
+        """
+        coefficient_digits = []
+        block_size = 1
+        remaining = index
+        for i in range(len(self.variables)):
+            suffix_size = self._variable_weight**(len(self.variables) - i - 1)
+            for digit, weight in enumerate(self._digit_weights):
+                size = block_size*weight*suffix_size
+                if remaining < size:
+                    coefficient_digits.append(digit)
+                    block_size *= weight
+                    break
+                remaining -= size
+        return coefficient_digits, remaining, block_size
+
+    def _get_block_offset(self, coefficient_digits):
+        """
+        Index of the first candidate with the given coefficient digits.
+        """
+        offset = 0
+        block_size = 1
+        for i, coefficient_digit in enumerate(coefficient_digits):
+            suffix_size = self._variable_weight**(len(self.variables) - i - 1)
+            offset += block_size*sum(self._digit_weights[:coefficient_digit])*suffix_size
+            block_size *= self._digit_weights[coefficient_digit]
+        return offset
+
+    def _get_digits(self, number, length):
+        digits = [0]*length
+        for i in range(length-1, -1, -1):
+            number, digits[i] = divmod(number, self.number_of_values)
+        return digits
+
+    def _get_powers(self, coefficients, power_number):
+        """
+        Powers of the variables, the power number gives the digits of the variables with nonzero coefficient.
+        """
+        live = [variable for variable, coefficient in enumerate(coefficients) if coefficient != 0]
+        powers = [0]*len(self.variables)
+        for variable, digit in zip(live, self._get_digits(power_number, len(live))):
+            powers[variable] = self.values[digit]
+        return powers
+
+    def get_candidate(self, index):
+        """
+        Returns the coefficients and the powers of the candidate with the given index.
+        """
+        coefficient_digits, power_number, block_size = self._decode_index(index)
+        coefficients = [self.values[digit] for digit in coefficient_digits]
+        return coefficients, self._get_powers(coefficients, power_number)
+
+    def get_index(self, coefficients, powers):
+        """
+        Index of a canonical candidate, inverse of get_candidate.
+        """
+        offset = self._get_block_offset([self.values.index(coefficient) for coefficient in coefficients])
+        power_number = 0
+        for coefficient, power in zip(coefficients, powers):
+            if coefficient != 0:
+                power_number = power_number*self.number_of_values + self.values.index(power)
+        return offset + power_number
+
+    def get_specialization(self, coefficients, powers):
+        """
+        Specialization [[coefficient, power], ...] for every segment of the diagram,
+        [0,0] for segments which are not transposed or are mapped to zero.
+        """
+        specialization = [[0,0] for i in range(self.number_of_segments)]
+        for segment, coefficient, power in zip(self.variables, coefficients, powers):
+            if coefficient != 0:
+                specialization[segment-1] = [coefficient, power]
+        return specialization
+
+    def _get_active_rows(self, coefficients):
+        """
+        The rows with nonzero coefficient after inserting the coefficients of the variables,
+        as list of coefficients and list of exponents.
+        """
+        row_coefficients = []
+        row_exponents = []
+        for coefficient, exponents in self.rows:
+            for variable, exponent in exponents:
+                coefficient *= coefficients[variable]**exponent
+                if coefficient == 0:
+                    break
+            if coefficient != 0:
+                row_coefficients.append(coefficient)
+                row_exponents.append(exponents)
+        return row_coefficients, row_exponents
+
+    def _get_allowed_parities(self, row_coefficients, row_exponents, live):
+        """
+        For every parity mask of the powers of the live variables (bit j set if the power of live[j] is odd)
+        whether the absolute value at t=-1 equals the one of the target.
+        The value at t=-1 is sum coefficient*(-1)^(sum power*exponent), it is computed for all masks
+        by a Walsh-Hadamard transform of the coefficients grouped by the parity mask of the exponents.
+        """
+        bits = {variable: 1 << j for j, variable in enumerate(live)}
+        values = [0]*(1 << len(live))
+        for coefficient, exponents in zip(row_coefficients, row_exponents):
+            mask = 0
+            for variable, exponent in exponents:
+                if exponent % 2 == 1:
+                    mask ^= bits[variable]
+            values[mask] += coefficient
+        step = 1
+        while step < len(values):
+            for i in range(0, len(values), 2*step):
+                for j in range(i, i+step):
+                    values[j], values[j+step] = values[j] + values[j+step], values[j] - values[j+step]
+            step *= 2
+        return [abs(value) == self.target_value_at_minus_one for value in values]
+
+    def is_match(self, row_coefficients, row_powers):
+        """
+        Checks if the terms coefficient*t^power give the target up to a power of t.
+        The span and the leading and trailing coefficients are checked before all terms are collected.
+        """
+        if not row_coefficients:
+            return not self.target_key
+        highest = max(row_powers)
+        lowest = min(row_powers)
+        if highest - lowest < self.target_span:
+            return False
+        leading = 0
+        trailing = 0
+        for coefficient, power in zip(row_coefficients, row_powers):
+            if power == highest:
+                leading += coefficient
+            if power == lowest:
+                trailing += coefficient
+        if leading != 0 and trailing != 0:
+            if highest - lowest != self.target_span or leading != self.target_leading or trailing != self.target_trailing:
+                return False
+        terms = {}
+        for coefficient, power in zip(row_coefficients, row_powers):
+            terms[power] = terms.get(power, 0) + coefficient
+        return get_normalized_key(terms) == self.target_key
+
+    def evaluate(self, coefficients, powers):
+        """
+        Checks a single candidate.
+        """
+        row_coefficients, row_exponents = self._get_active_rows(coefficients)
+        row_powers = [sum(powers[variable]*exponent for variable, exponent in exponents) for exponents in row_exponents]
+        return self.is_match(row_coefficients, row_powers)
+
+    def _run_block(self, coefficients, start, stop):
+        """
+        Check the candidates with the given coefficients and power numbers start <= number < stop.
+        Yields the matching powers.
+        """
+        row_coefficients, row_exponents = self._get_active_rows(coefficients)
+        if self.prune and sum(row_coefficients) != self.target_value_at_one:
+            return
+        live = [variable for variable, coefficient in enumerate(coefficients) if coefficient != 0]
+        allowed_parities = None
+        if self.prune and self.target_value_at_minus_one is not None:
+            allowed_parities = self._get_allowed_parities(row_coefficients, row_exponents, live)
+            if not any(allowed_parities):
+                return
+        # variable -> list of (active row, exponent)
+        variable_rows = [[] for variable in self.variables]
+        for row, exponents in enumerate(row_exponents):
+            for variable, exponent in exponents:
+                variable_rows[variable].append((row, exponent))
+
+        digits = self._get_digits(start, len(live))
+        powers = self._get_powers(coefficients, start)
+        parity = 0
+        for j, variable in enumerate(live):
+            if powers[variable] % 2 == 1:
+                parity |= 1 << j
+        row_powers = [sum(powers[variable]*exponent for variable, exponent in exponents) for exponents in row_exponents]
+        for number in range(start, stop):
+            if (allowed_parities is None or allowed_parities[parity]) and self.is_match(row_coefficients, row_powers):
+                yield list(powers)
+            # next powers, updating the powers of the rows of the changed variables
+            for j in range(len(live)-1, -1, -1):
+                variable = live[j]
+                digits[j] = (digits[j] + 1) % self.number_of_values
+                new_power = self.values[digits[j]]
+                difference = new_power - powers[variable]
+                powers[variable] = new_power
+                if difference % 2 == 1:
+                    parity ^= 1 << j
+                for row, exponent in variable_rows[variable]:
+                    row_powers[row] += difference*exponent
+                if digits[j] != 0:
+                    break
+
+    def run(self, start=0, stop=None):
+        """
+        Check the candidates with start <= index < stop.
+        Yields (index, specialization) for every match.
+        """
+        if stop is None:
+            stop = self.number_of_candidates
+        index = start
+        while index < stop:
+            coefficient_digits, power_number, block_size = self._decode_index(index)
+            coefficients = [self.values[digit] for digit in coefficient_digits]
+            block_start = index - power_number
+            block_stop = min(stop - block_start, block_size)
+            for powers in self._run_block(coefficients, power_number, block_stop):
+                yield self.get_index(coefficients, powers), self.get_specialization(coefficients, powers)
+            index = block_start + block_stop
+
+# search of the current worker process, set by _init_worker
+_worker_search = None
+
+def _init_worker(search):
+    global _worker_search
+    _worker_search = search
+
+def _load_checkpoint(path, fingerprint, start, stop):
+    """
+    Returns (next index, positives) of a shard, starting at start if there is no valid checkpoint.
+    """
+    if path is not None and os.path.exists(path):
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint["fingerprint"] == fingerprint and checkpoint["start"] == start and checkpoint["stop"] == stop:
+            return checkpoint["next"], [tuple(positive) for positive in checkpoint["positives"]]
+    return start, []
+
+def _save_checkpoint(path, fingerprint, start, stop, next_index, positives):
+    """
+    Write the progress of a shard, the file is replaced atomically so a crash leaves the last checkpoint.
+    """
+    checkpoint = {"fingerprint": fingerprint, "start": start, "stop": stop, "next": next_index, "positives": positives}
+    with open(path + ".tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(path + ".tmp", path)
+
+def _run_shard(start, stop, checkpoint_path, checkpoint_every):
+    """
+    Check the candidates start <= index < stop of the worker search, resuming from the checkpoint.
+    """
+    search = _worker_search
+    fingerprint = search.get_fingerprint()
+    next_index, positives = _load_checkpoint(checkpoint_path, fingerprint, start, stop)
+    while next_index < stop:
+        chunk_stop = min(next_index + checkpoint_every, stop)
+        positives += search.run(next_index, chunk_stop)
+        next_index = chunk_stop
+        if checkpoint_path is not None:
+            _save_checkpoint(checkpoint_path, fingerprint, start, stop, next_index, positives)
+    return positives
+
+def get_shards(number_of_candidates, number_of_shards):
+    """
+    Split the indices 0 <= index < number_of_candidates into number_of_shards ranges (start, stop).
+    """
+    number_of_shards = max(1, min(number_of_shards, number_of_candidates))
+    bounds = [number_of_candidates*i//number_of_shards for i in range(number_of_shards+1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def run_sharded(search, max_workers=None, number_of_shards=None, checkpoint_dir=None, checkpoint_every=100000):
+    """
+    Run the search in a process pool, the candidate indices are split into shards.
+    Every worker receives the search once when it is started.
+    With checkpoint_dir every shard writes its next index and the found positives to
+    checkpoint_dir/shard_<i>.json after every checkpoint_every candidates, so a run with the
+    same arguments resumes where the previous run stopped.
+    Returns the list of (index, specialization) for every match sorted by index.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if number_of_shards is None:
+        number_of_shards = 16*max_workers
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    shards = get_shards(search.number_of_candidates, number_of_shards)
+    positives = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(search,)) as executor:
+        futures = []
+        for i, (start, stop) in enumerate(shards):
+            checkpoint_path = None if checkpoint_dir is None else os.path.join(checkpoint_dir, f"shard_{i}.json")
+            futures.append(executor.submit(_run_shard, start, stop, checkpoint_path, checkpoint_every))
+        for future in futures:
+            positives += future.result()
+    return sorted((index, specialization) for index, specialization in positives)
@@ -0,0 +1,134 @@
+from collections import deque
+
+def get_rank_weights(diagram, fixed_segment):
+    """
+    Weight of every marker position, such that the rank of a Kauffman state in the lattice
+    is the sum of the weights of its markers minus the sum for the minimal state.
+
+    The states are the perfect matchings of crossings and regions (without the regions at the fixed segment)
+    and a transposition at a segment turns the cycle crossing-region-crossing-region around the segment.
+    The number of transpositions at a segment is a height function on the segments: it is 0 at the fixed segment
+    and changes between the two segments at a corner by +-1 if the marker of one of the states is at the corner.
+    Summing the heights along a spanning tree of the segments, a corner of a tree edge gets the size of the subtree
+    behind it as weight, all other corners the weight 0.
+
+    Returns a list of 4 weights for every crossing.
+    """
+    # segment -> list of (neighbouring segment, crossing id, corner, direction)
+    neighbours = {segment: [] for segment in diagram.segments}
+    for crossing in diagram.crossings:
+        for corner in range(4):
+            first, second = crossing.segments[corner], crossing.segments[(corner + 1) % 4]
+            if first != second:
+                neighbours[first].append((second, crossing.id, corner, 1))
+                neighbours[second].append((first, crossing.id, corner, -1))
+    parents = {fixed_segment: None}
+    order = [fixed_segment]
+    queue = deque([fixed_segment])
+    while queue:
+        segment = queue.popleft()
+        for neighbour, crossing_id, corner, direction in neighbours[segment]:
+            if neighbour not in parents:
+                parents[neighbour] = (segment, crossing_id, corner, direction)
+                order.append(neighbour)
+                queue.append(neighbour)
+    subtree_sizes = {segment: 1 for segment in order}
+    for segment in reversed(order[1:]):
+        subtree_sizes[parents[segment][0]] += subtree_sizes[segment]
+    weights = [[0]*4 for crossing in diagram.crossings]
+    for segment in order[1:]:
+        parent, crossing_id, corner, direction = parents[segment]
+        weights[crossing_id][corner] -= direction*subtree_sizes[segment]
+    return weights
+
+def get_region_crossing_order(options):
+    """
+    Order of the crossings for the counting, greedy such that few regions are open at the same time,
+    i.e. occur at already counted and at not yet counted crossings.
+    options: for every crossing the list of (region, weight) of its marker positions
+    """
+    regions_at_crossing = [{region for region, weight in crossing_options} for crossing_options in options]
+    # region -> number of crossings at the region which are not yet in the order
+    remaining_crossings = {}
+    for regions in regions_at_crossing:
+        for region in regions:
+            remaining_crossings[region] = remaining_crossings.get(region, 0) + 1
+    open_regions = set()
+    remaining = set(range(len(options)))
+    order = []
+    while remaining:
+        def get_frontier_change(crossing_id):
+            opened = sum(1 for region in regions_at_crossing[crossing_id] if region not in open_regions and remaining_crossings[region] > 1)
+            closed = sum(1 for region in regions_at_crossing[crossing_id] if region in open_regions and remaining_crossings[region] == 1)
+            return opened - closed
+        crossing_id = min(remaining, key=lambda crossing_id: (get_frontier_change(crossing_id), crossing_id))
+        remaining.remove(crossing_id)
+        order.append(crossing_id)
+        for region in regions_at_crossing[crossing_id]:
+            remaining_crossings[region] -= 1
+            if remaining_crossings[region] == 0:
+                open_regions.discard(region)
+            else:
+                open_regions.add(region)
+    return order
+
+def get_rank_sizes(diagram, fixed_segment):
+    """
+    Number of Kauffman states of every rank of the state lattice, without building the lattice.
+
+    The crossings are processed one after the other, a partial state is described by the set of open regions
+    which already have a marker. For each such set the number of partial states is kept for every sum of rank weights,
+    a region whose crossings are all processed must have a marker and is dropped from the set.
+    The lowest weight sum is the one of the minimal state, so the rank is the weight sum minus the lowest one.
+    """
+    excluded_regions = diagram.get_segment_regions(fixed_segment)
+    weights = get_rank_weights(diagram, fixed_segment)
+    options = []
+    for crossing in diagram.crossings:
+        crossing_options = []
+        for corner in range(4):
+            region = diagram.get_region_id(crossing.id, corner)
+            if region not in excluded_regions:
+                crossing_options.append((region, weights[crossing.id][corner]))
+        options.append(crossing_options)
+    order = get_region_crossing_order(options)
+    last_crossing = {}
+    for step, crossing_id in enumerate(order):
+        for region, weight in options[crossing_id]:
+            last_crossing[region] = step
+
+    # bitmask of the open regions with a marker -> {weight sum: number of partial states}
+    partial_states = {0: {0: 1}}
+    for step, crossing_id in enumerate(order):
+        closing = 0
+        for region, weight in options[crossing_id]:
+            if last_crossing[region] == step:
+                closing |= 1 << region
+        next_states = {}
+        for used, counts in partial_states.items():
+            for region, weight in options[crossing_id]:
+                bit = 1 << region
+                if used & bit:
+                    continue
+                next_used = used | bit
+                if next_used & closing != closing:
+                    continue
+                next_counts = next_states.setdefault(next_used & ~closing, {})
+                for weight_sum, count in counts.items():
+                    next_counts[weight_sum + weight] = next_counts.get(weight_sum + weight, 0) + count
+        partial_states = next_states
+
+    counts = partial_states.get(0, {})
+    if not counts:
+        return []
+    lowest = min(counts)
+    rank_sizes = [0]*(max(counts) - lowest + 1)
+    for weight_sum, count in counts.items():
+        rank_sizes[weight_sum - lowest] += count
+    return rank_sizes
+
+def count_states(diagram, fixed_segment):
+    """
+    Number of Kauffman states of the diagram with the fixed segment.
+    """
+    return sum(get_rank_sizes(diagram, fixed_segment))
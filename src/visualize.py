@@ -47,8 +47,10 @@ class LatticeImage:
         return (x, y)
 
     def get_edge_coordinates(self,edge):
-        start_node = self.lattice.get_node_by_transpositions(edge[0].transpositions.string)
-        end_node = self.lattice.get_node_by_transpositions(edge[1].transpositions.string)
+        """
+        edge is a tuple (start node, end node, transposed segment) of the lattice.
+        """
+        start_node, end_node = edge[0], edge[1]
         start_node_coords = self.get_node_coordinates(start_node)
         end_node_coords = self.get_node_coordinates(end_node)
 
@@ -61,8 +63,10 @@ class LatticeImage:
         self.set_node_coordinates()
         im = Image.new('1', self.image_size, "white")
         draw = ImageDraw.Draw(im)
-        for edge in self.lattice.edges:
-            draw.line(self.get_edge_coordinates(edge), fill="black", width=1)
+        nodes = self.lattice.nodes
+        for node_id, node in enumerate(nodes):
+            for successor_id, segment in self.lattice.get_successors(node_id):
+                draw.line(self.get_edge_coordinates((node, nodes[successor_id], segment)), fill="black", width=1)
         for node in self.lattice.nodes:
             node_coords = self.get_node_coordinates(node)
 
@@ -1,7 +1,19 @@
+import json
+import os
+import tempfile
 import unittest
+import unittest.mock
+from fractions import Fraction
 from src.knotdiagram import KnotDiagram,Crossing, Region
 from src.kstate import KauffmanState, StateNode
 from src.lattice import StateLattice
+from src.polynom import LaurentPolynom, MultivariatePolynom
+from src.jonespolynom import JonesState, get_state_counts, get_state_counts_by_tangles
+from src.specialization import SpecializationSearch, run_sharded
+from src.cache import InvariantCache
+from src.rolfsen import RolfsenTable, build_rolfsen_table
+from src.batch import run_batch, get_two_bridge_tasks
+from src.two_bridge_knots import TwoBridgeDiagram
 
 
 class TestTrefoilKnotDiagram(unittest.TestCase):
@@ -17,6 +29,82 @@ class TestTrefoilKnotDiagram(unittest.TestCase):
         region = Region((1,4))
         self.assertEqual(self.diagram.get_region(1,3),region)
 
+    def test_segment_incidence(self):
+        self.assertEqual(self.diagram.segment_incidence[1], ((0,2),(1,3)))
+        self.assertEqual(self.diagram.get_crossings_containing_segment(1), [Crossing(self.pd[0]),Crossing(self.pd[1])])
+
+    def test_crossing_neighbours(self):
+        self.assertEqual(self.diagram.crossing_neighbours[0][2], (1,3))
+        self.assertEqual(self.diagram.crossing_neighbours[1][3], (0,2))
+
+    def test_region_table(self):
+        regions = self.diagram.get_regions()
+        self.assertEqual(len(regions), self.diagram.number_of_regions)
+        region_id = self.diagram.get_region_id(1,3)
+        self.assertEqual(regions[region_id], Region((1,4)))
+        self.assertEqual(len(self.diagram.get_segment_regions(1)), 2)
+        self.assertIn(region_id, self.diagram.get_segment_regions(4))
+
+    def test_jones_polynom(self):
+        jones = self.diagram.get_jones_polynom()
+        self.assertEqual(jones, LaurentPolynom([[1,1],[1,3],[-1,4]]))
+        self.assertTrue(all(isinstance(power, int) for power in jones.terms))
+
+    def test_state_counts(self):
+        counts = get_state_counts(self.diagram)
+        self.assertEqual(sum(counts.values()), 2**3)
+        for i in range(2**3):
+            state = JonesState.from_integer(3,i)
+            key = (state.get_number_of_A_labels(), state.get_number_of_circles_in_splitting(self.diagram))
+            self.assertIn(key, counts)
+
+    def test_state_counts_by_tangles(self):
+        self.assertEqual(get_state_counts_by_tangles(self.diagram), get_state_counts(self.diagram))
+        self.assertEqual(self.diagram.get_kauffman_bracket("tangles"), self.diagram.get_kauffman_bracket("states"))
+
+    def test_canonical_form(self):
+        figure_eight = KnotDiagram([(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)])
+        # relabeled, reordered and with a crossing rotated by two positions
+        relabeling = {1: 4, 2: 1, 3: 8, 4: 2, 5: 3, 6: 7, 7: 5, 8: 6}
+        pd = [tuple(relabeling[segment] for segment in crossing) for crossing in figure_eight.pd_notation]
+        pd = [pd[2], pd[0][2:] + pd[0][:2], pd[3], pd[1]]
+        diagram = KnotDiagram(pd)
+        self.assertEqual(diagram.canonical_form(), figure_eight.canonical_form())
+        self.assertEqual(diagram.canonical_hash(), figure_eight.canonical_hash())
+        for segment in figure_eight.segments:
+            self.assertEqual(diagram.get_canonical_segment(relabeling[segment]), figure_eight.get_canonical_segment(segment))
+        self.assertNotEqual(figure_eight.get_canonical_segment(1), figure_eight.get_canonical_segment(2))
+        self.assertNotEqual(figure_eight.canonical_hash(), self.diagram.canonical_hash())
+
+    def test_canonical_form_of_link(self):
+        link_pd = [(1,5,4,16),(16,4,15,3),(3,13,2,12),(2,11,1,12),(15,7,14,8),(8,14,9,13),
+                   (5,17,6,22),(22,6,21,7),(9,18,10,19),(19,10,20,11),(21,17,20,18)]
+        link = KnotDiagram(link_pd)
+        # relabeled and reordered, every crossing rotated by two positions
+        pd = [tuple((segment + 5) % 22 + 1 for segment in crossing[2:] + crossing[:2]) for crossing in reversed(link_pd)]
+        diagram = KnotDiagram(pd)
+        self.assertEqual(diagram.canonical_hash(), link.canonical_hash())
+        self.assertEqual(diagram.get_canonical_segment(13), link.get_canonical_segment(7))
+        # the component with segments 1 to 4 reversed
+        reversal = {1: 4, 2: 3, 3: 2, 4: 1}
+        pd = [tuple(reversal.get(segment, segment) for segment in crossing) for crossing in link_pd]
+        pd = [crossing[2:] + crossing[:2] if crossing[0] in reversal and crossing[2] in reversal else crossing for crossing in pd]
+        reversed_link = KnotDiagram(pd)
+        self.assertNotEqual(reversed_link.get_jones_polynom(), link.get_jones_polynom())
+        self.assertNotEqual(reversed_link.canonical_hash(), link.canonical_hash())
+
+    def test_alexander_polynom_by_determinant(self):
+        self.assertEqual(self.diagram.get_alexander_polynom("determinant"), self.diagram.get_alexander_polynom("lattice"))
+        figure_eight = KnotDiagram([(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)])
+        self.assertEqual(figure_eight.get_alexander_polynom("determinant"), figure_eight.get_alexander_polynom("lattice"))
+        link = KnotDiagram([(1,5,4,16),(16,4,15,3),(3,13,2,12),(2,11,1,12),(15,7,14,8),(8,14,9,13),
+                            (5,17,6,22),(22,6,21,7),(9,18,10,19),(19,10,20,11),(21,17,20,18)])
+        self.assertEqual(link.get_alexander_polynom("determinant"), link.get_alexander_polynom("lattice"))
+        self.assertEqual(link.get_alexander_polynom(), LaurentPolynom([[-5,-1],[28,0],[-50,1],[36,2],[-9,3]]))
+        perko = KnotDiagram([(2,13,3,14),(5,10,6,11),(7,16,8,17),(8,1,9,2),(11,18,12,19),
+                             (12,3,13,4),(15,6,16,7),(17,14,18,15),(19,4,20,5),(20,9,1,10)])
+        self.assertEqual(perko.get_alexander_polynom("determinant"), perko.get_alexander_polynom("lattice"))
+
     def test_crossing_count(self):
         self.assertEqual(self.diagram.number_of_crossings, 3)
 
@@ -46,6 +134,37 @@ class TestKauffmanState(unittest.TestCase):
         state = KauffmanState.from_marker_positions(self.diagram, marker_positions)
         self.assertEqual(list(state.marker_positions.values()), marker_positions)
 
+    def test_transpose_changes_two_markers(self):
+        state = KauffmanState.from_marker_positions(self.diagram, [0,1,1])
+        transposed = state.transpose(6)
+        self.assertEqual(state.markers, bytes([0,1,1]))
+        self.assertEqual(sum(a != b for a,b in zip(state.markers, transposed.markers)), 2)
+
+    def test_equal_states_have_equal_hash(self):
+        state = KauffmanState.from_marker_positions(self.diagram, [0,1,1])
+        self.assertEqual(hash(state), hash(self.kstate.transpose(6).transpose(6)))
+        self.assertEqual(state, KauffmanState.from_marker_positions(self.diagram, [0,1,1]))
+
+    def test_incremental_transposable_segments(self):
+        figure_eight = KnotDiagram([(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)])
+        state = StateLattice(figure_eight, 2).get_minimal_state()
+        state.get_all_possible_transpositions("cw")
+        while state.get_all_possible_transpositions("ccw"):
+            state = state.transpose(state.get_all_possible_transpositions("ccw")[0], "ccw")
+            fresh = KauffmanState._from_markers(figure_eight, state.markers)
+            for direction in ("cw", "ccw"):
+                self.assertEqual(state.get_all_possible_transpositions(direction),
+                                 [segment for segment in figure_eight.segments if fresh.is_transposable(segment, direction)])
+
+    def test_kstate_matching(self):
+        for segment in self.diagram.segments:
+            state = self.diagram.get_kstate_matching(segment)
+            self.assertTrue(KauffmanState._is_valid_state(self.diagram, list(state.markers), segment))
+
+    def test_kstate_bruteforce(self):
+        state = self.diagram.get_kstate_bruteforce(1)
+        self.assertTrue(KauffmanState._is_valid_state(self.diagram, list(state.markers), 1))
+
     def test_invalid_kauffman_state_missing_crossing(self):
         marker_positions = [0,1]  # Only 2 crossings provided
         with self.assertRaises(ValueError):
@@ -84,6 +203,302 @@ class TestStateLattice(unittest.TestCase):
         min_state = KauffmanState.from_marker_positions(self.diagram, [3,0,3])
         self.assertEqual(self.state_lattice.get_minimal_state(1), min_state)
 
+class TestTrefoilLattice(unittest.TestCase):
+    def setUp(self):
+        self.pd = [(6, 4, 1,3), (4, 2, 5, 1), (2, 6, 3, 5)]
+        self.diagram = KnotDiagram(self.pd)
+        self.lattice = StateLattice(self.diagram,1)
+
+    def test_number_of_states(self):
+        self.assertEqual(len(self.lattice.nodes), 3)
+        self.assertEqual(len(self.lattice.edges), 2)
+
+    def test_get_node_by_transpositions(self):
+        self.assertEqual(self.lattice.get_node_by_transpositions("6,2"), self.lattice.nodes[2])
+        self.assertIsNone(self.lattice.get_node_by_transpositions("6"))
+
+    def test_minimal_and_maximal_state(self):
+        self.assertEqual(self.lattice.get_minimal_state(), self.lattice.nodes[0].state)
+        self.assertEqual(self.lattice.get_maximal_state(), self.lattice.nodes[-1].state)
+
+    def test_f_polynomial(self):
+        f_polynomial = self.lattice.get_f_polynomial()
+        self.assertEqual(f_polynomial.polynom, [[1,0,0,0,0,0,0],[1,0,1,0,0,0,0],[1,0,1,0,0,0,1]])
+        self.assertEqual(f_polynomial.to_latex(), "1 + y_{2} + y_{2}y_{6}")
+        streamed = StateLattice(self.diagram,1,build=False)
+        self.assertEqual(streamed.get_f_polynomial().polynom, f_polynomial.polynom)
+
+    def test_streamed_layers(self):
+        streamed = StateLattice(self.diagram,1,build=False)
+        self.assertEqual(streamed.nodes, [])
+        self.assertEqual([len(layer) for layer in streamed.iter_states(order="rank")], [1,1,1])
+        self.assertEqual(streamed.get_depth(), self.lattice.get_depth())
+        self.assertEqual(streamed.transposed_segments, self.lattice.transposed_segments)
+        self.assertEqual(streamed.get_nodes_in_layer(1), self.lattice.get_nodes_in_layer(1))
+
+    def test_cover_relations(self):
+        self.assertEqual(self.lattice.get_successors(0), [(1, 2)])
+        self.assertEqual(self.lattice.get_predecessors(2), [(1, 6)])
+        self.assertEqual(self.lattice.get_predecessors(0), [])
+        self.assertEqual(self.lattice.get_node_id(self.lattice.nodes[2]), 2)
+        figure_eight = StateLattice(KnotDiagram([(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)]), 2)
+        up = {(source, target, segment) for source in range(len(figure_eight.nodes)) for target, segment in figure_eight.get_successors(source)}
+        down = {(source, target, segment) for target in range(len(figure_eight.nodes)) for source, segment in figure_eight.get_predecessors(target)}
+        self.assertEqual(up, down)
+        self.assertEqual(len(up), len(figure_eight.edges))
+
+    def test_parallel_build(self):
+        import src.lattice
+        figure_eight = KnotDiagram([(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)])
+        sequential = StateLattice(figure_eight, 2)
+        layer_size = src.lattice.PARALLEL_MIN_LAYER_SIZE
+        src.lattice.PARALLEL_MIN_LAYER_SIZE = 1
+        try:
+            parallel = StateLattice(figure_eight, 2, workers=2)
+        finally:
+            src.lattice.PARALLEL_MIN_LAYER_SIZE = layer_size
+        self.assertEqual([node.transpositions.string for node in parallel.nodes], [node.transpositions.string for node in sequential.nodes])
+        self.assertEqual(parallel.up_targets, sequential.up_targets)
+        self.assertEqual(parallel.down_labels, sequential.down_labels)
+        self.assertEqual(parallel.get_f_polynomial().polynom, sequential.get_f_polynomial().polynom)
+
+    def test_parallel_expansion_keeps_transposable_segments(self):
+        import src.lattice
+        figure_eight = KnotDiagram([(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)])
+        lattice = StateLattice(figure_eight, 2)
+        src.lattice._init_worker(figure_eight.pd_notation)
+        try:
+            minimal_state = KauffmanState._from_markers(src.lattice._worker_diagram, lattice.nodes[0].state.markers)
+            state = minimal_state.transpose(minimal_state.get_all_possible_transpositions("ccw")[0], "ccw")
+            transposable = state.get_transposable_state()
+            calls = []
+            is_transposable = KauffmanState.is_transposable
+            def count_calls(state, segment, direction):
+                calls.append(segment)
+                return is_transposable(state, segment, direction)
+            with unittest.mock.patch.object(KauffmanState, "is_transposable", count_calls):
+                incremental = src.lattice._expand_packed_states((state.markers, [transposable]))
+                self.assertEqual(len(calls), bin(transposable[2]).count("1"))
+                calls.clear()
+                fresh = src.lattice._expand_packed_states((state.markers, [None]))
+                self.assertEqual(len(calls), figure_eight.number_of_segments)
+            self.assertEqual(incremental, fresh)
+        finally:
+            src.lattice._worker_diagram = None
+        # the bitsets are dropped from the stored nodes once they are expanded
+        self.assertTrue(all(node.state.get_transposable_state() is None for node in lattice.nodes))
+
+    def test_parallel_build_large_layers(self):
+        import src.lattice
+        # 13860 states, the layers from 1000 states on are expanded in the workers
+        twists = KnotDiagram(TwoBridgeDiagram([2]*11).get_pd_notation())
+        sequential = StateLattice(twists, 1)
+        layer_size = src.lattice.PARALLEL_MIN_LAYER_SIZE
+        src.lattice.PARALLEL_MIN_LAYER_SIZE = 1000
+        try:
+            parallel = StateLattice(twists, 1, workers=2)
+        finally:
+            src.lattice.PARALLEL_MIN_LAYER_SIZE = layer_size
+        self.assertEqual(max(parallel.get_rank_sizes()), 1767)
+        self.assertEqual(parallel.up_targets, sequential.up_targets)
+        self.assertEqual(parallel.up_labels, sequential.up_labels)
+        self.assertEqual(parallel.nodes[-1].transpositions.string, sequential.nodes[-1].transpositions.string)
+        self.assertEqual(parallel.get_node_id(sequential.nodes[5000]), 5000)
+        self.assertEqual(parallel.get_f_polynomial().polynom, sequential.get_f_polynomial().polynom)
+
+    def test_save_and_load(self):
+        figure_eight = StateLattice(KnotDiagram([(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)]), 2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lattice.bin")
+            figure_eight.save(path)
+            for mmap in (True, False):
+                loaded = StateLattice.load(path, mmap=mmap)
+                self.assertEqual(loaded.diagram.pd_notation, figure_eight.diagram.pd_notation)
+                self.assertEqual([node.transpositions.string for node in loaded.nodes], [node.transpositions.string for node in figure_eight.nodes])
+                self.assertEqual([node.state for node in loaded.nodes], [node.state for node in figure_eight.nodes])
+                self.assertEqual(loaded.get_successors(1), figure_eight.get_successors(1))
+                self.assertEqual(loaded.get_predecessors(len(loaded.nodes) - 1), figure_eight.get_predecessors(len(figure_eight.nodes) - 1))
+                self.assertEqual(loaded.get_rank_sizes(), figure_eight.get_rank_sizes())
+                self.assertEqual(loaded.get_f_polynomial().polynom, figure_eight.get_f_polynomial().polynom)
+                self.assertEqual(loaded.get_node_id(figure_eight.nodes[-1]), len(figure_eight.nodes) - 1)
+                del loaded
+        with self.assertRaises(ValueError):
+            StateLattice(self.diagram, 1, build=False).save(path)
+
+    def test_rank_sizes(self):
+        self.assertEqual(self.lattice.get_rank_sizes(), [1, 1, 1])
+        figure_eight = KnotDiagram([(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)])
+        for segment in figure_eight.segments:
+            lattice = StateLattice(figure_eight, segment, build=False)
+            self.assertEqual(lattice.get_rank_sizes(), [len(layer) for layer in lattice.iter_layers()])
+            self.assertEqual(lattice.get_number_of_states(), len(StateLattice(figure_eight, segment).nodes))
+
+    def test_get_node_by_state(self):
+        for node in self.lattice.nodes:
+            self.assertIs(self.lattice.get_node_by_state(node.state), node)
+
+class TestLaurentPolynom(unittest.TestCase):
+    def setUp(self):
+        self.laurent = LaurentPolynom([[-1,2],[-1,-2],[1,3],[0,5]])
+
+    def test_terms_are_combined(self):
+        self.assertEqual(LaurentPolynom([[1,1],[2,1],[-3,1],[1,0]]).polynom, [[1,0]])
+        self.assertEqual(self.laurent.polynom, [[-1,-2],[-1,2],[1,3]])
+
+    def test_equality_and_hash(self):
+        other = LaurentPolynom([[1,3],[-1,-2],[-1,2]])
+        self.assertEqual(self.laurent, other)
+        self.assertEqual(hash(self.laurent), hash(other))
+
+    def test_arithmetic(self):
+        d = LaurentPolynom([[-1,2],[-1,-2]])
+        self.assertEqual(d*d, LaurentPolynom([[1,4],[2,0],[1,-4]]))
+        self.assertEqual(d**3, d*d*d)
+        self.assertEqual(d + LaurentPolynom([[1,2]]), LaurentPolynom([[-1,-2]]))
+        self.assertEqual(LaurentPolynom([[-1,1]])**-2, LaurentPolynom([[1,-2]]))
+
+    def test_equal_up_to_factor(self):
+        shifted = LaurentPolynom([[1,1]]) * self.laurent
+        self.assertTrue(shifted.equal_up_to_factor(self.laurent))
+        self.assertFalse(shifted.equal_up_to_factor(LaurentPolynom([[-1,0]]) * self.laurent))
+
+    def test_to_latex(self):
+        self.assertEqual(self.laurent.to_latex(), "- t^{-2} - t^{2} + t^{3}")
+
+    def test_fractional_powers(self):
+        root = LaurentPolynom([[1,Fraction(1,4)]])
+        self.assertEqual((root**4).polynom, [[1,1]])
+        self.assertEqual((root**2).to_latex(), "t^{1/2}")
+
+class TestMultivariatePolynom(unittest.TestCase):
+    def setUp(self):
+        # 2 - x + x y^2
+        self.polynom = MultivariatePolynom([[2,0,0],[-1,1,0],[1,1,2]])
+
+    def test_specialize_to_monomials(self):
+        specialization = [LaurentPolynom([[-1,1]]), LaurentPolynom([[2,-1]])]
+        self.assertEqual(self.polynom.specialize_to_laurent(specialization), LaurentPolynom([[2,0],[1,1],[-4,-1]]))
+
+    def test_specialize_to_laurent_polynoms(self):
+        x = LaurentPolynom([[1,1],[1,0]])
+        y = LaurentPolynom([[1,-1]])
+        expected = LaurentPolynom([[2,0]]) + LaurentPolynom([[-1,0]])*x + x*y*y
+        self.assertEqual(self.polynom.specialize_to_laurent([x,y]), expected)
+
+    def test_zero_variable(self):
+        specialization = [LaurentPolynom([[0,0]]), LaurentPolynom([[1,1]])]
+        self.assertEqual(self.polynom.specialize_to_laurent(specialization), LaurentPolynom([[2,0]]))
+
+class TestSpecializationSearch(unittest.TestCase):
+    def setUp(self):
+        self.diagram = KnotDiagram([(6, 4, 1,3), (4, 2, 5, 1), (2, 6, 3, 5)])
+        self.lattice = StateLattice(self.diagram,1)
+        self.jones = self.diagram.get_jones_polynom()
+        self.search = SpecializationSearch(self.lattice, self.jones)
+
+    def test_matches_specialize_to_laurent(self):
+        f_pol = self.lattice.get_f_polynomial()
+        expected = []
+        for index in range(self.search.number_of_candidates):
+            specialization = self.search.get_specialization(*self.search.get_candidate(index))
+            specialized = f_pol.specialize_to_laurent(f_pol.get_specialization(specialization))
+            if specialized.equal_up_to_factor(self.jones):
+                expected.append((index, specialization))
+        self.assertTrue(expected)
+        self.assertEqual(list(self.search.run()), expected)
+
+    def test_index_ranges(self):
+        chunks = []
+        for start in range(0, self.search.number_of_candidates, 7):
+            chunks += list(self.search.run(start, start+7))
+        self.assertEqual(chunks, list(self.search.run()))
+
+    def test_pruning(self):
+        search = SpecializationSearch(self.lattice, self.jones, prune=False)
+        self.assertEqual(list(self.search.run()), list(search.run()))
+        self.assertEqual(search.number_of_candidates, 21**len(self.lattice.transposed_segments))
+
+    def test_get_index(self):
+        for index in range(self.search.number_of_candidates):
+            self.assertEqual(self.search.get_index(*self.search.get_candidate(index)), index)
+
+    def test_run_sharded_resumes(self):
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            matches = run_sharded(self.search, max_workers=1, number_of_shards=3, checkpoint_dir=checkpoint_dir, checkpoint_every=50)
+            self.assertEqual(matches, list(self.search.run()))
+            self.assertEqual(len(os.listdir(checkpoint_dir)), 3)
+            self.assertEqual(run_sharded(self.search, max_workers=1, number_of_shards=3, checkpoint_dir=checkpoint_dir), matches)
+
+class TestInvariantCache(unittest.TestCase):
+    def setUp(self):
+        self.pd = [(4,2,5,1),(8,6,1,5),(6,3,7,4),(2,7,3,8)]
+        # the same diagram with the segment labels shifted by 2 and the crossings reordered
+        self.shifted_pd = [(8,6,1,5),(6,3,7,4),(2,7,3,8),(4,2,5,1)]
+        self.shifted_pd = [tuple((segment+1) % 8 + 1 for segment in crossing) for crossing in self.shifted_pd]
+        self.results = {"number_of_states": 3, "jones_polynomial": "t", "f_polynomial": "1 + y_{6}"}
+
+    def test_get(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = InvariantCache(os.path.join(directory, "cache.sqlite"))
+            self.assertEqual(cache.get(self.pd, 1), {})
+            cache.put(self.pd, 1, self.results)
+            self.assertEqual(cache.get(self.pd, 1), self.results)
+            self.assertEqual(cache.get(self.shifted_pd, 3), {"number_of_states": 3, "jones_polynomial": "t"})
+            self.assertEqual(cache.get(self.shifted_pd, 2), {})
+            cache.close()
+
+    def test_get_link_with_reversed_component(self):
+        link_pd = [(1,5,4,16),(16,4,15,3),(3,13,2,12),(2,11,1,12),(15,7,14,8),(8,14,9,13),
+                   (5,17,6,22),(22,6,21,7),(9,18,10,19),(19,10,20,11),(21,17,20,18)]
+        # the component with segments 1 to 4 reversed, which changes the Jones polynomial
+        reversal = {1: 4, 2: 3, 3: 2, 4: 1}
+        reversed_pd = [tuple(reversal.get(segment, segment) for segment in crossing) for crossing in link_pd]
+        reversed_pd = [crossing[2:] + crossing[:2] if crossing[0] in reversal and crossing[2] in reversal else crossing
+                       for crossing in reversed_pd]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = InvariantCache(os.path.join(directory, "cache.sqlite"))
+            cache.put(link_pd, 5, self.results)
+            self.assertEqual(cache.get(reversed_pd, 5), {})
+            cache.close()
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = InvariantCache(os.path.join(directory, "cache.sqlite"), max_bytes=150)
+            cache.put(self.pd, 1, self.results)
+            cache.put(self.pd, 2, self.results)
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.get(self.pd, 1), {})
+            cache.close()
+
+class TestRolfsenTable(unittest.TestCase):
+    def test_build_and_read(self):
+        rolfsen_pd_dict = {"0_1": [], "3_1": [[1, 4, 2, 5], [3, 6, 4, 1], [5, 2, 6, 3]], "big": [[300, 1, 2, 3]]}
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "rolfsen.json")
+            table_path = os.path.join(directory, "rolfsen.bin")
+            with open(json_path, "w") as f:
+                json.dump(rolfsen_pd_dict, f)
+            build_rolfsen_table(json_path, table_path)
+            table = RolfsenTable(table_path)
+            self.assertEqual(list(table), ["0_1", "3_1", "big"])
+            self.assertEqual(table["0_1"], [])
+            self.assertEqual(table["3_1"], [(1, 4, 2, 5), (3, 6, 4, 1), (5, 2, 6, 3)])
+            self.assertEqual(table["big"], [(300, 1, 2, 3)])
+            self.assertEqual(table.get_number_of_crossings("3_1"), 3)
+            self.assertNotIn("4_1", table)
+            table.close()
+
+class TestBatch(unittest.TestCase):
+    def test_run_batch(self):
+        tasks = get_two_bridge_tasks([[2,3]]) + [("broken", [(1,2,3,4)], 7)]
+        rows = {row["name"]: row for row in run_batch(tasks, ["states", "jones"], workers=2, timeout=60)}
+        diagram = KnotDiagram(tasks[0][1])
+        self.assertEqual(rows["tb_2_3"]["status"], "ok")
+        self.assertEqual(rows["tb_2_3"]["results"]["states"]["number_of_states"], len(diagram.get_lattice(1).nodes))
+        self.assertEqual(rows["tb_2_3"]["results"]["jones"], diagram.get_jones_polynom().to_latex())
+        self.assertEqual(set(rows["tb_2_3"]["timings"]), {"states", "jones"})
+        self.assertEqual(rows["broken"]["status"], "error")
+
 
 if __name__=="__main__":
     unittest.main()
\ No newline at end of file